@@ -38,6 +38,10 @@ let g:vimini_log_file = get(g:, 'vimini_log_file', expand('~/.var/vimini/vimini.
 " Configuration: Logging on/off
 let g:vimini_logging = get(g:, 'vimini_logging', 'off')
 
+" Configuration: Propose 'Update <file>' for changes of at most 2 lines in a
+" single file in :ViminiCommit, without calling the model (1 = on, 0 = off)
+let g:vimini_commit_trivial = get(g:, 'vimini_commit_trivial', 1)
+
 " Configuration: Default path for saved reviews
 let g:vimini_review_path = get(g:, 'vimini_review_path', '')
 
@@ -67,18 +71,18 @@ except Exception as e:
 EOF
 
 " Expose a function to list available models
-function! ViminiListModels()
+function! ViminiListModels(bang)
   py3 << EOF
 try:
     from vimini import main
-    main.list_models()
+    main.list_models(force=vim.eval('a:bang') == '!')
 except Exception as e:
     error_message = str(e).replace("'", "''")
     vim.command(f"echoerr '[Vimini] Error: {error_message}'")
 EOF
 endfunction
 
-command! ViminiListModels call ViminiListModels()
+command! -bang ViminiListModels call ViminiListModels('<bang>')
 
 " Expose a function to Chat with Gemini
 function! ViminiChat(prompt)
@@ -319,6 +323,18 @@ endfunction
 
 command! -nargs=* ViminiCommit call ViminiCommit(<q-args>)
 
+" Asks to confirm a generated commit message, started by a one-shot timer
+function! ViminiInternalConfirmCommit(timer)
+  py3 << EOF
+try:
+    from vimini import main
+    main.confirm_pending_commit()
+except Exception as e:
+    error_message = str(e).replace("'", "''")
+    vim.command(f"echoerr '[Vimini] Error: {error_message}'")
+EOF
+endfunction
+
 " Expose a function to manage uploaded files
 function! ViminiFiles()
   py3 << EOF
@@ -2,7 +2,6 @@ import vim
 import threading
 import uuid
 import queue
-from google.genai import types
 from vimini import util
 
 # --- Autocomplete state ---
@@ -39,7 +38,9 @@ def _show_autocomplete_popup(suggestion):
             'highlight': 'Pmenu', 'zindex': 200, 'moved': 'any',
         }
 
-        popup_id = vim.eval(f"popup_create('{suggestion}', {popup_options})")
+        # vim.Function() passes the suggestion and options as Vim values, so
+        # quotes in the suggestion cannot break the call.
+        popup_id = vim.Function('popup_create')(suggestion, popup_options)
         if popup_id == 0:
             return
         vim.command("redraw!")
@@ -48,20 +49,19 @@ def _show_autocomplete_popup(suggestion):
         try:
             key_code = vim.eval("getcharstr(-1)")
             if key_code == "\t":  # Tab accepts the suggestion.
-                vim.command(f"call feedkeys('{suggestion}', 'n')")
+                vim.Function('feedkeys')(suggestion, 'n')
             else:
-                vim.command(f"call feedkeys('{key_code}', 'n')")
+                vim.Function('feedkeys')(key_code, 'n')
         except vim.error: # Also catches Vim:Interrupt from Ctrl-C.
             pass
         finally:
             # Ensure the popup is always closed, no matter what key was pressed.
-            vim.eval(f"popup_close({popup_id})")
+            vim.Function('popup_close')(popup_id)
             # Redraw to clear any screen artifacts from the popup.
             vim.command("redraw!")
 
     except Exception as e:
-        error_message = str(e).replace("'", "''")
-        vim.command(f"echoerr '[Vimini] Autocomplete popup Error: {error_message}'")
+        util.echoerr(f"[Vimini] Autocomplete popup Error: {e}")
 
 def process_autocomplete_queue():
     """
@@ -74,12 +74,11 @@ def process_autocomplete_queue():
             # The popup function handles restoring the cursor itself.
             _show_autocomplete_popup(data)
         elif task_type == 'error':
-            vim.command(f"echom '[Vimini] Autocomplete Error: {data}'")
+            util.echom(f"[Vimini] Autocomplete Error: {data}")
     except queue.Empty:
         pass # Queue is empty, nothing to do.
     except Exception as e:
-        error_message = str(e).replace("'", "''")
-        vim.command(f"echom '[Vimini] Queue processing error: {error_message}'")
+        util.echom(f"[Vimini] Queue processing error: {e}")
 
 def _autocomplete_worker(job_id, buffer_content, cursor_pos, verbose):
     """
@@ -133,8 +132,7 @@ def _autocomplete_worker(job_id, buffer_content, cursor_pos, verbose):
         _autocomplete_queue.put(('popup', suggestion))
 
     except Exception as e:
-        error_message = str(e).replace("'", "''")
-        _autocomplete_queue.put(('error', error_message))
+        _autocomplete_queue.put(('error', str(e)))
 
 def autocomplete(verbose=False):
     """
@@ -3,7 +3,6 @@ import json
 import os
 import time
 from vimini import util
-from google.genai import types
 
 # Global variable to hold the chat session
 chat_session = {}
@@ -11,63 +10,73 @@ chat_session = {}
 Q_prefix = "Q: "
 A_prefix = "A: "
 
-# Define agent tools for safe execution
-agent_tools = [
-    types.Tool(
-        function_declarations=[
-            types.FunctionDeclaration(
-                name='apply_patch',
-                description='Applies a unified diff patch to modify files. ' +
-                    'Ensure the patch paths are relative to the project root ' +
-                    'directory. Assume patch -p1 will be used. ' +
-                    'Include sufficient unmodified context lines for the patch to apply cleanly.',
-                parameters=types.Schema(
-                    type=types.Type.OBJECT,
-                    properties={
-                        'diff_content': types.Schema(
-                            type=types.Type.STRING,
-                            description='The unified diff patch to apply.'
+# Agent tool declarations, built on first use by _get_agent_tools().
+_AGENT_TOOLS = None
+
+def _get_agent_tools():
+    """
+    Returns the tools exposed to the chat agent for safe execution.
+    """
+    global _AGENT_TOOLS
+    if _AGENT_TOOLS is None:
+        from google.genai import types
+        _AGENT_TOOLS = [
+            types.Tool(
+                function_declarations=[
+                    types.FunctionDeclaration(
+                        name='apply_patch',
+                        description='Applies a unified diff patch to modify files. ' +
+                            'Ensure the patch paths are relative to the project root ' +
+                            'directory. Assume patch -p1 will be used. ' +
+                            'Include sufficient unmodified context lines for the patch to apply cleanly.',
+                        parameters=types.Schema(
+                            type=types.Type.OBJECT,
+                            properties={
+                                'diff_content': types.Schema(
+                                    type=types.Type.STRING,
+                                    description='The unified diff patch to apply.'
+                                )
+                            },
+                            required=['diff_content']
                         )
-                    },
-                    required=['diff_content']
-                )
-            ),
-            types.FunctionDeclaration(
-                name='read_file',
-                description='Reads the content of a file. Only files within the current working directory or its subdirectories can be read.',
-                parameters=types.Schema(
-                    type=types.Type.OBJECT,
-                    properties={
-                        'filepath': types.Schema(
-                            type=types.Type.STRING,
-                            description='Path to the file to read.'
+                    ),
+                    types.FunctionDeclaration(
+                        name='read_file',
+                        description='Reads the content of a file. Only files within the current working directory or its subdirectories can be read.',
+                        parameters=types.Schema(
+                            type=types.Type.OBJECT,
+                            properties={
+                                'filepath': types.Schema(
+                                    type=types.Type.STRING,
+                                    description='Path to the file to read.'
+                                )
+                            },
+                            required=['filepath']
                         )
-                    },
-                    required=['filepath']
-                )
-            ),
-            types.FunctionDeclaration(
-                name='list_directory',
-                description='Reads the list of files and directories in a given path. Cannot list above the current working directory.',
-                parameters=types.Schema(
-                    type=types.Type.OBJECT,
-                    properties={
-                        'directory_path': types.Schema(
-                            type=types.Type.STRING,
-                            description='The relative path to the directory to list. Defaults to "." for the current directory.'
+                    ),
+                    types.FunctionDeclaration(
+                        name='list_directory',
+                        description='Reads the list of files and directories in a given path. Cannot list above the current working directory.',
+                        parameters=types.Schema(
+                            type=types.Type.OBJECT,
+                            properties={
+                                'directory_path': types.Schema(
+                                    type=types.Type.STRING,
+                                    description='The relative path to the directory to list. Defaults to "." for the current directory.'
+                                )
+                            }
                         )
-                    }
-                )
+                    )
+                ]
             )
         ]
-    )
-]
+    return _AGENT_TOOLS
 
 def safe_apply_patch(diff_content):
     """
     Wrapper around apply_patch to ensure no file outside the current project directory can be touched.
     """
-    from vimini.code import _DIFF_SEPARATOR
+    from vimini.code import _DIFF_SEPARATOR, track_code_buffer
 
     project_root = os.path.abspath(util.get_git_repo_root() or vim.eval("getcwd()"))
 
@@ -106,6 +115,7 @@ def safe_apply_patch(diff_content):
 
     diff_buffer = vim.current.buffer
     diff_buffer_num = diff_buffer.number
+    track_code_buffer(diff_buffer_num, job_id)
 
     vim.command(f"let b:vimini_project_root = '{project_root}'")
     vim.command(f"let b:vimini_job_id = '{job_id}'")
@@ -121,14 +131,7 @@ def safe_apply_patch(diff_content):
     vim.command("redraw!")
 
     # Wait until the buffer is closed (by user applying or rejecting it)
-    while True:
-        exists = False
-        for b in vim.buffers:
-            if b.number == diff_buffer_num:
-                exists = True
-                break
-        if not exists:
-            break
+    while vim.Function('bufexists')(diff_buffer_num):
         time.sleep(1)
 
     return True, "Patch buffer closed. User has either applied or rejected the patch."
@@ -159,10 +162,10 @@ def chat(prompt=None):
     util.log_info(f"chat({prompt})")
 
     # --- 1. Find or create the chat window ---
-    win_nr = vim.eval("bufwinnr('^Vimini Chat$')")
+    win_nr = vim.Function('bufwinnr')('^Vimini Chat$')
 
-    if int(win_nr) > 0:
-        vim.command(f"{win_nr}wincmd w")
+    if win_nr > 0:
+        util.goto_window(win_nr)
     else:
         # Create and initialize a new chat window
         util.new_split()
@@ -173,9 +176,12 @@ def chat(prompt=None):
         session = chat_session.get('session')
         if session:
             buf_num = vim.current.buffer.number
-            _write_to_buffer(buf_num, ["History:"], clear=True)
+            # Write the whole history at once rather than one message at a
+            # time, each of which would toggle 'modifiable' and redraw.
+            history_lines = ["History:"]
             for msg in session.get_history():
-                _write_to_buffer(buf_num, [f"{msg.role}: {msg.parts[0].text}"])
+                history_lines.extend(f"{msg.role}: {msg.parts[0].text}".split('\n'))
+            _write_to_buffer(buf_num, history_lines, clear=True)
 
     current_buffer = vim.current.buffer
     buf_num = current_buffer.number
@@ -184,7 +190,10 @@ def chat(prompt=None):
     chat_session['buf_num'] = buf_num
 
     # --- 2. Initialize buffer if it's empty ---
-    if len(current_buffer) == 1 and not current_buffer[0]:
+    # Let Vim test the last line rather than copying it into Python, as it
+    # can hold a long answer.
+    line_count, last_line_empty = map(int, vim.eval("[line('$'), empty(getline('$'))]"))
+    if line_count == 1 and last_line_empty:
         _write_to_buffer(buf_num, [""], clear=True)
 
     if not prompt:
@@ -192,9 +201,8 @@ def chat(prompt=None):
 
     # --- 3. Prepare for Async Job ---
     # Add spacing if needed
-    last_line = current_buffer[-1]
     lines_to_add = []
-    if last_line != "":
+    if not last_line_empty:
         lines_to_add.append("")
 
     lines_to_add.append(f"{Q_prefix}{prompt}")
@@ -213,9 +221,11 @@ def chat(prompt=None):
         if not client:
              return
 
+        from google.genai import types
+
         # Create the GenAI session object with Agentic config
         agent_config = types.GenerateContentConfig(
-            tools=agent_tools,
+            tools=_get_agent_tools(),
             system_instruction=(
                 "When explicitly requested to change code You act as an expert"
                 "autonomous coding agent and software engineer, and can access"
@@ -393,12 +403,10 @@ def _write_to_buffer(buf_num, content, clear=False, append_to_last=False):
         append_to_last (bool): If True, appends string content to the very last line
                                (and adds new lines if content has them).
     """
-    buf = None
-    for b in vim.buffers:
-        if b.number == buf_num:
-            buf = b
-            break
-    if not buf: return
+    try:
+        buf = vim.buffers[buf_num]
+    except KeyError:
+        return
 
     # Determine if we need to scroll (only if active window)
     is_active = (vim.current.buffer.number == buf_num)
@@ -408,18 +416,22 @@ def _write_to_buffer(buf_num, content, clear=False, append_to_last=False):
         if clear:
              buf[:] = content if isinstance(content, list) else [content]
         else:
-            if append_to_last and isinstance(content, str):
+            if append_to_last and isinstance(content, str) and '\n' not in content:
+                # Chunks without a newline only extend the last line.
+                if content:
+                    buf[-1] += content
+            elif append_to_last and isinstance(content, str):
                 # Split content into lines to handle newlines correctly
                 lines = content.split('\n')
 
-                # Append first part to the last line of buffer
-                if len(buf) > 0:
-                    buf[-1] += lines[0]
-                else:
-                    buf[:] = [lines[0]]
-
-                # Append subsequent lines if any
-                if len(lines) > 1:
+                # Append first part to the last line of buffer and any
+                # subsequent lines with a single slice assignment. The last
+                # line is only rewritten if there is text to add to it.
+                if len(buf) == 0:
+                    buf[:] = lines
+                elif lines[0]:
+                    buf[-1:] = [buf[-1] + lines[0]] + lines[1:]
+                elif len(lines) > 1:
                     buf.append(lines[1:])
             else:
                 # Append list of lines or single string as new line
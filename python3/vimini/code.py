@@ -1,12 +1,35 @@
 import vim
-import os, json, subprocess, tempfile, re
-from google.genai import types
+import os, io, json, subprocess, difflib, itertools, re
 from vimini import util, context
 
 # Global data store keyed by buffer number to exchange data between python calls.
 _BUFFER_DATA_STORE = {}
+# Job IDs of the 'Vimini Code' buffers created by code(), keyed by buffer
+# number, so apply_code() can find them without scanning every buffer or
+# reading b:vimini_job_id back from Vim.
+_CODE_BUFFER_JOBS = {}
 # Separator line to distinguish between thoughts/summary and the actual diff
 _DIFF_SEPARATOR = "========== VIMINI DIFF START =========="
+# Output rules appended to every code() prompt. Kept as a single constant so
+# it is built once instead of on every call.
+_CODE_PROMPT_RULES = (
+    "IMPORTANT:\n"
+    "1. Your response must be a single JSON object with a 'files' key.\n"
+    "2. The value of 'files' must be an array of file objects.\n"
+    "3. Each file object must have three string keys: 'file_path', 'file_type', and 'file_content'.\n"
+    "4. 'file_path' must be the full path of the file relative to the project directory. When modifying a file from the context, you MUST use its original file path for the 'file_path' property.\n"
+    "5. 'file_type' must be either 'text/plain' for the full file content or 'text/x-diff' for a patch in the unified diff format.\n"
+    "6. 'file_content' must contain either the new, complete source code or the diff patch, corresponding to the 'file_type'.\n"
+    "7. Diffs ('text/x-diff') can be returned only if explicitly mentioned as an acceptable output in the prompt or if the files are really difficult or too large to process. For small files, returning the entire modified file ('text/plain') is the most preferred option.\n"
+    "8. You can modify existing files or create new files as needed to fulfill the request."
+)
+
+def track_code_buffer(buffer_num, job_id):
+    """
+    Registers a 'Vimini Code' buffer so apply_code() can find it. Used for
+    buffers created outside of code(), such as the chat agent's patches.
+    """
+    _CODE_BUFFER_JOBS[buffer_num] = job_id
 
 def code(prompt, verbose=False, temperature=None):
     """
@@ -21,18 +44,19 @@ def code(prompt, verbose=False, temperature=None):
         if not client:
             return
 
+        # Fetch the working directory and g:context_files with one vim.eval.
+        cwd, context_files_list = vim.eval("[getcwd(), get(g:, 'context_files', [])]")
         project_root = util.get_git_repo_root()
         if not project_root:
-            project_root = vim.eval('getcwd()')
+            project_root = cwd
 
         # Gather context files manually and resolve them relative to project_root
         file_paths_to_include = []
-        for b in vim.buffers:
-            if b.name and os.path.exists(b.name):
-                file_paths_to_include.append(os.path.abspath(b.name))
+        for _, name in util.list_named_buffers():
+            if os.path.exists(name):
+                file_paths_to_include.append(os.path.abspath(name))
 
         try:
-            context_files_list = vim.eval("get(g:, 'context_files', [])")
             if isinstance(context_files_list, list):
                 for f in context_files_list:
                     if os.path.isabs(f):
@@ -51,6 +75,8 @@ def code(prompt, verbose=False, temperature=None):
         return
 
     # --- 2. Define Schema and Prompt ---
+    from google.genai import types
+
     file_object_schema = types.Schema(
         type=types.Type.OBJECT,
         properties={
@@ -72,13 +98,14 @@ def code(prompt, verbose=False, temperature=None):
     )
 
     original_buffer = vim.current.buffer
+    original_name = original_buffer.name
 
-    if original_buffer.name:
-        main_file_name = os.path.relpath(original_buffer.name, project_root) if os.path.isabs(original_buffer.name) else original_buffer.name
+    if original_name:
+        main_file_name = os.path.relpath(original_name, project_root) if os.path.isabs(original_name) else original_name
         task_instruction = f"Your primary task is to modify the file named '{main_file_name}'."
     else:
         task_instruction = "Your primary task is to address the concern in the active buffer (if any).\n"
-        buffer_content = "\n".join(original_buffer[:])
+        buffer_content = context.get_buffer_content(original_buffer)
         if buffer_content.strip():
             task_instruction += f"\n\nAdditional context from the current active buffer:\n{buffer_content}\n"
 
@@ -99,15 +126,7 @@ def code(prompt, verbose=False, temperature=None):
             "Your identity is Vimini, and you are integrated into the vimini project."
             f"{task_instruction}\n\n"
             f"{context_files_section}"
-            "IMPORTANT:\n"
-            "1. Your response must be a single JSON object with a 'files' key.\n"
-            "2. The value of 'files' must be an array of file objects.\n"
-            "3. Each file object must have three string keys: 'file_path', 'file_type', and 'file_content'.\n"
-            "4. 'file_path' must be the full path of the file relative to the project directory. When modifying a file from the context, you MUST use its original file path for the 'file_path' property.\n"
-            "5. 'file_type' must be either 'text/plain' for the full file content or 'text/x-diff' for a patch in the unified diff format.\n"
-            "6. 'file_content' must contain either the new, complete source code or the diff patch, corresponding to the 'file_type'.\n"
-            "7. Diffs ('text/x-diff') can be returned only if explicitly mentioned as an acceptable output in the prompt or if the files are really difficult or too large to process. For small files, returning the entire modified file ('text/plain') is the most preferred option.\n"
-            "8. You can modify existing files or create new files as needed to fulfill the request."
+            f"{_CODE_PROMPT_RULES}"
         ),
         *uploaded_files
     ]
@@ -121,13 +140,11 @@ def code(prompt, verbose=False, temperature=None):
     base_buffer_name = f"[{job_id}] Vimini Code"
     safe_name = f"{base_buffer_name} [->G?]".replace(" ", "\\ ")
     vim.command(f"file {safe_name}")
-    vim.command("setlocal buftype=nofile")
-    vim.command("setlocal bufhidden=wipe")
-    vim.command("setlocal noswapfile")
-    vim.command("setlocal filetype=markdown")
+    vim.command("setlocal buftype=nofile bufhidden=wipe noswapfile filetype=markdown")
 
     code_buffer = vim.current.buffer
     code_buffer_num = code_buffer.number
+    track_code_buffer(code_buffer_num, job_id)
 
     # Store buffer-local variables
     vim.command(f"let b:vimini_project_root = '{project_root}'")
@@ -157,8 +174,7 @@ def code(prompt, verbose=False, temperature=None):
 
     def on_thought(text):
         update_status_receiving()
-        if verbose:
-            util.append_to_buffer(code_buffer_num, text)
+        util.append_to_buffer(code_buffer_num, text)
 
     def on_finish():
         try:
@@ -179,12 +195,42 @@ def code(prompt, verbose=False, temperature=None):
         response_schema=multi_file_output_schema
     )
 
-    util.start_async_job(client, kwargs, {
+    callbacks = {
         "on_chunk": on_chunk,
-        "on_thought": on_thought,
         "on_finish": on_finish,
         "on_error": on_error
-    }, job_id=job_id)
+    }
+    # Thoughts are only shown in verbose mode, so skip the thought handler
+    # entirely otherwise.
+    if verbose:
+        callbacks["on_thought"] = on_thought
+
+    util.start_async_job(client, kwargs, callbacks, job_id=job_id)
+
+def _unified_diff_lines(original_content, new_content):
+    """
+    Computes the hunks of a unified diff between two strings in-process.
+
+    Returns:
+        list: The hunk lines, without the '---'/'+++' header, or an empty
+              list if the contents are identical.
+    """
+    # StringIO.readlines() keeps line endings and only splits on '\n', which
+    # lets us flag a missing newline at the end of a file like `diff -u` does.
+    original_lines = io.StringIO(original_content).readlines()
+    new_lines = io.StringIO(new_content).readlines()
+
+    diff = difflib.unified_diff(original_lines, new_lines, lineterm='')
+    hunk_lines = []
+    for line in itertools.islice(diff, 2, None): # Skip the ---/+++ header
+        if line.startswith('@@'):
+            hunk_lines.append(line)
+        elif line.endswith('\n'):
+            hunk_lines.append(line[:-1])
+        else:
+            hunk_lines.append(line)
+            hunk_lines.append("\\ No newline at end of file")
+    return hunk_lines
 
 def _finalize_code_generation(json_aggregator, project_root, job_id, buffer_num):
     """Parses accumulated JSON and generates diff."""
@@ -268,47 +314,28 @@ def _finalize_code_generation(json_aggregator, project_root, job_id, buffer_num)
                     except Exception as e:
                         continue
 
-                with tempfile.NamedTemporaryFile(mode="w+", delete=False, encoding="utf-8") as f_orig, \
-                     tempfile.NamedTemporaryFile(mode="w+", delete=False, encoding="utf-8") as f_ai:
-                    f_orig.write(original_content)
-                    f_ai.write(ai_generated_code)
-                    orig_filepath = f_orig.name
-                    ai_filepath = f_ai.name
-
-                try:
-                    source_path = orig_filepath if file_exists else "/dev/null"
-                    cmd = ["diff", "-u", source_path, ai_filepath]
-                    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-                    if result.returncode > 1:
-                        continue # diff error
-
-                    diff_lines = result.stdout.split("\n")
-                    if len(diff_lines) <= 2 and not original_content and not ai_generated_code:
-                        continue # Empty diff
-
-                    combined_diff_output.append(f"diff --git a/{relative_path} b/{relative_path}")
-                    if not file_exists:
-                        combined_diff_output.append("new file mode 100644")
-                        combined_diff_output.append(f"--- /dev/null")
-                        combined_diff_output.append(f"+++ b/{relative_path}")
-                    else:
-                        combined_diff_output.append(f"--- a/{relative_path}")
-                        combined_diff_output.append(f"+++ b/{relative_path}")
+                diff_lines = _unified_diff_lines(original_content, ai_generated_code)
+                if not diff_lines:
+                    continue # No changes for this file
 
-                    combined_diff_output.extend(diff_lines[2:])
+                combined_diff_output.append(f"diff --git a/{relative_path} b/{relative_path}")
+                if not file_exists:
+                    combined_diff_output.append("new file mode 100644")
+                    combined_diff_output.append(f"--- /dev/null")
+                    combined_diff_output.append(f"+++ b/{relative_path}")
+                else:
+                    combined_diff_output.append(f"--- a/{relative_path}")
+                    combined_diff_output.append(f"+++ b/{relative_path}")
 
-                finally:
-                    if os.path.exists(orig_filepath): os.remove(orig_filepath)
-                    if os.path.exists(ai_filepath): os.remove(ai_filepath)
+                combined_diff_output.extend(diff_lines)
 
         if not combined_diff_output:
             util.append_to_buffer(buffer_num, "\nAI content is identical to the original files or returned empty diff.")
             return "AI content is identical to the original files or returned empty diff."
 
-        # Append Separator and Diff
-        separator_block = f"\n{_DIFF_SEPARATOR}\n"
-        diff_text = "\n".join(combined_diff_output)
-        util.append_to_buffer(buffer_num, separator_block + diff_text)
+        # Append Separator and Diff as lines, no need to join them into a
+        # single string only to have append_to_buffer() split it again.
+        util.append_to_buffer(buffer_num, ["", _DIFF_SEPARATOR] + combined_diff_output)
 
         # Switch filetype to diff for syntax highlighting
         # We use setbufvar to avoid switching windows
@@ -334,18 +361,22 @@ def show_diff():
         cmd = ['git', '-C', repo_path, 'diff', '--color=never']
 
         # Execute the command.
+        # The output is read line by line straight into the list used for the
+        # buffer, rather than captured as one string and split afterwards.
         util.display_message("Running git diff...")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as proc:
+            diff_lines = [line.rstrip('\n') for line in proc.stdout]
+            stderr_output = proc.stderr.read()
         util.display_message("") # Clear message
 
         # Handle git errors (e.g., not a git repository).
-        if result.returncode != 0 and not result.stdout.strip():
-            error_message = result.stderr.strip()
+        if proc.returncode != 0 and not diff_lines:
+            error_message = stderr_output.strip()
             util.display_message(f"Git error: {error_message}", error=True)
             return
 
         # Handle case with no modifications.
-        if not result.stdout.strip():
+        if not diff_lines:
             util.display_message("No modifications found.", history=True)
             return
 
@@ -355,9 +386,7 @@ def show_diff():
         # Setting filetype to 'diff' helps with syntax highlighting
         vim.command("setlocal buftype=nofile filetype=diff noswapfile")
 
-        # The output from git contains ANSI escape codes for color.
-        # We place this raw output into the buffer.
-        vim.current.buffer[:] = result.stdout.split("\n")
+        vim.current.buffer[:] = diff_lines
 
     except FileNotFoundError:
         util.display_message("Error: `git` command not found. Is it in your PATH?", error=True)
@@ -408,6 +437,11 @@ def apply_patch(diff_content, project_root=None, silent=False):
                 if path != "/dev/null":
                     modified_files.add(path)
 
+        # Index the open buffers by path, fetched from Vim in one call.
+        buffer_nums_by_path = {}
+        for number, name in util.list_named_buffers():
+            buffer_nums_by_path.setdefault(os.path.abspath(name), number)
+
         for relative_path in modified_files:
             absolute_path = os.path.join(project_root, relative_path)
 
@@ -419,19 +453,19 @@ def apply_patch(diff_content, project_root=None, silent=False):
                 except Exception:
                     pass
 
-            normalized_target_path = os.path.abspath(absolute_path)
-            for buf in vim.buffers:
-                if buf.name and os.path.abspath(buf.name) == normalized_target_path:
-                    # Reload buffer if visible
-                    win_nr = vim.eval(f"bufwinnr({buf.number})")
-                    if int(win_nr) > 0:
-                        vim.command(f"{win_nr}wincmd w")
-                        vim.command("e!")
-                        vim.command("wincmd p")
-                    else:
-                        # Mark buffer to be reloaded when entered
-                        vim.command(f"checktime {buf.number}")
-                    break
+            buf_num = buffer_nums_by_path.get(os.path.abspath(absolute_path))
+            if buf_num is not None:
+                # Reload buffer if visible
+                win_nr = vim.Function('bufwinnr')(buf_num)
+                if win_nr == vim.current.window.number:
+                    vim.command("e!")
+                elif win_nr > 0:
+                    vim.command(f"{win_nr}wincmd w")
+                    vim.command("e!")
+                    vim.command("wincmd p")
+                else:
+                    # Mark buffer to be reloaded when entered
+                    vim.command(f"checktime {buf_num}")
         return True
 
     except FileNotFoundError:
@@ -451,27 +485,43 @@ def apply_code(job_id=None):
     util.log_info(f"apply_code(job_id={job_id})")
     diff_buffer = None
 
-    # 1. Find all potential Vimini Code buffers
+    # 1. Find all potential Vimini Code buffers, starting from the ones
+    # created by code(). Buffer numbers are never reused, so a number that
+    # still resolves is still our buffer.
     candidates = []
-    for buf in vim.buffers:
-        if buf.name and 'Vimini Code' in os.path.basename(buf.name):
-            candidates.append(buf)
+    candidate_job_ids = []
+    for num, bid in sorted(_CODE_BUFFER_JOBS.items()):
+        try:
+            candidates.append(vim.buffers[num])
+            candidate_job_ids.append(str(bid))
+        except KeyError:
+            del _CODE_BUFFER_JOBS[num]
 
     if not candidates:
-        util.display_message("`Vimini Code` buffer not found. Was :ViminiCode run?", error=True)
-        return
+        # Fall back to matching buffer names, e.g. for buffers created before
+        # a reload. Vim filters its buffer list and returns the number and
+        # job ID of every match in a single vim.eval.
+        found = vim.eval(
+            "map(filter(getbufinfo(), 'fnamemodify(v:val.name, \":t\") =~# \"Vimini Code\"'), "
+            "'[v:val.bufnr, getbufvar(v:val.bufnr, \"vimini_job_id\", \"\")]')"
+        )
+        if not found:
+            util.display_message("`Vimini Code` buffer not found. Was :ViminiCode run?", error=True)
+            return
+
+        candidates = [vim.buffers[int(num)] for num, _ in found]
+        candidate_job_ids = [bid for _, bid in found]
 
     # 2. Filter by job_id if provided, or handle selection logic
     if job_id is not None:
         target_candidates = []
-        for buf in candidates:
+        for buf, bid in zip(candidates, candidate_job_ids):
             # Try matching by internal buffer variable
             try:
-                bid = vim.eval(f"getbufvar({buf.number}, 'vimini_job_id', '')")
                 if bid and int(bid) == job_id:
                     target_candidates.append(buf)
                     continue
-            except:
+            except ValueError:
                 pass
 
             # Try matching by filename pattern "[{job_id}] Vimini Code"
@@ -493,12 +543,7 @@ def apply_code(job_id=None):
         elif len(candidates) > 1:
             # Multiple buffers exist: Error and list them
             msg = "Multiple Vimini Code buffers found. Please specify which job to apply using -j <job_id>.\nAvailable Jobs:\n"
-            for buf in candidates:
-                bid = "Unknown"
-                try:
-                    bid = vim.eval(f"getbufvar({buf.number}, 'vimini_job_id', '')")
-                except: pass
-
+            for buf, bid in zip(candidates, candidate_job_ids):
                 if not bid or bid == "Unknown":
                      m = re.search(r'\[(\d+)\]', os.path.basename(buf.name))
                      if m: bid = m.group(1)
@@ -512,19 +557,21 @@ def apply_code(job_id=None):
             # Only one buffer exists
             diff_buffer = candidates[0]
 
-    # 4. Extract diff content using separator
-    project_root = vim.eval(f"getbufvar({diff_buffer.number}, 'vimini_project_root', '')")
+    # 4. Extract diff content using separator. Let Vim find the separator
+    # and join the diff lines below it, so the buffer lines are never copied
+    # into Python one by one. The project root is fetched in the same call.
+    buf_num = diff_buffer.number
+    project_root, separator_index = vim.eval(
+        f"[getbufvar({buf_num}, 'vimini_project_root', ''), "
+        f"match(getbufline({buf_num}, 1, '$'), '\\V\\C{_DIFF_SEPARATOR}')]"
+    )
+    separator_index = int(separator_index)
     if not project_root:
         project_root = util.get_git_repo_root() or vim.eval("getcwd()")
 
-    separator_index = -1
-    for i, line in enumerate(diff_buffer):
-        if _DIFF_SEPARATOR in line:
-            separator_index = i
-            break
-
     if separator_index != -1:
-        diff_content = "\n".join(diff_buffer[separator_index + 1:])
+        # getbufline() is 1-based, the diff starts on the line after the separator.
+        diff_content = vim.eval(f"join(getbufline({buf_num}, {separator_index + 2}, '$'), \"\\n\")")
         # Ensure the patch content ends with a newline
         if diff_content and not diff_content.endswith('\n'):
             diff_content += '\n'
@@ -535,15 +582,15 @@ def apply_code(job_id=None):
 
     if not diff_content:
         util.display_message("Diff is empty. Nothing to apply.", history=True)
-        vim.command(f"bdelete! {diff_buffer.number}")
-        if diff_buffer.number in _BUFFER_DATA_STORE:
-            del _BUFFER_DATA_STORE[diff_buffer.number]
+        vim.command(f"silent! bwipeout! {buf_num}")
+        _CODE_BUFFER_JOBS.pop(buf_num, None)
+        _BUFFER_DATA_STORE.pop(buf_num, None)
         return
 
     if apply_patch(diff_content, project_root):
         # Remove from data store
-        if diff_buffer.number in _BUFFER_DATA_STORE:
-            del _BUFFER_DATA_STORE[diff_buffer.number]
+        _BUFFER_DATA_STORE.pop(buf_num, None)
 
         # Cleanup
-        vim.command(f"bdelete! {diff_buffer.number}")
+        vim.command(f"silent! bwipeout! {buf_num}")
+        _CODE_BUFFER_JOBS.pop(buf_num, None)
@@ -3,12 +3,66 @@ import os
 import io
 import time
 import json
+import hashlib
 from . import util
-from google.genai import types
 
 # --- Context File Uploading ---
 # (moved from util.py)
 
+# Joined buffer contents keyed by buffer number, stored with the buffer's
+# changedtick so unchanged buffers are not re-joined on every request.
+_BUFFER_CONTENT_CACHE = {}
+
+def get_buffer_content(buf):
+    """
+    Returns the content of a Vim buffer as a single string, reusing the
+    cached copy if the buffer has not changed since it was last read.
+    """
+    tick = vim.Function('getbufvar')(buf.number, 'changedtick')
+    cached = _BUFFER_CONTENT_CACHE.get(buf.number)
+    if cached and cached[0] == tick:
+        return cached[1]
+
+    # Let Vim join the lines, rather than copying each line into a Python
+    # string first.
+    content = vim.eval(f"join(getbufline({buf.number}, 1, '$'), \"\\n\")")
+    _prune_buffer_content_cache()
+    _BUFFER_CONTENT_CACHE[buf.number] = (tick, content)
+    return content
+
+def _prune_buffer_content_cache():
+    """
+    Drops the cached contents of buffers that no longer exist. Buffer numbers
+    are never reused, so these entries would otherwise stay for the session.
+    """
+    if not _BUFFER_CONTENT_CACHE:
+        return
+    existing = vim.eval(f"filter({list(_BUFFER_CONTENT_CACHE)}, 'bufexists(v:val)')")
+    existing = {int(num) for num in existing}
+    for num in list(_BUFFER_CONTENT_CACHE):
+        if num not in existing:
+            del _BUFFER_CONTENT_CACHE[num]
+
+# SHA-256 of the content of the files uploaded in this session, keyed by the
+# remote file name. Lets a file that looks stale (a modified buffer, or a
+# newer mtime) be reused when its content is actually unchanged.
+_UPLOADED_CONTENT_HASHES = {}
+
+def _context_content_hash(file_path, buf_number):
+    """
+    Returns the SHA-256 of a context file's content as it would be uploaded,
+    or None if it cannot be read.
+    """
+    try:
+        if buf_number is not None:
+            content = get_buffer_content(vim.buffers[buf_number])
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+    except Exception:
+        return None
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
 def find_context_files(file_paths_to_include=None):
     """
     Generate a list of files to be used as context.
@@ -29,9 +83,9 @@ def find_context_files(file_paths_to_include=None):
         # If a specific list of files is provided, use that.
         # We still need to check if they are open in buffers to get latest content.
         open_buffers_by_path = {}
-        for b in vim.buffers:
-            if b.name and os.path.exists(b.name):
-                open_buffers_by_path[os.path.abspath(b.name)] = b.number
+        for number, name in util.list_named_buffers():
+            if os.path.exists(name):
+                open_buffers_by_path[os.path.abspath(name)] = number
 
         for file_path in file_paths_to_include:
             abs_path = os.path.abspath(file_path)
@@ -42,11 +96,11 @@ def find_context_files(file_paths_to_include=None):
         return files_to_upload
 
     # First, add all file-backed buffers. This gives them priority.
-    for b in vim.buffers:
-        if b.name and os.path.exists(b.name):
-            abs_path = os.path.abspath(b.name)
+    for number, name in util.list_named_buffers():
+        if os.path.exists(name):
+            abs_path = os.path.abspath(name)
             if abs_path not in seen_file_paths:
-                files_to_upload.append((abs_path, b.number))
+                files_to_upload.append((abs_path, number))
                 seen_file_paths.add(abs_path)
 
     # Second, add any files from g:context_files that aren't already in the list.
@@ -123,11 +177,17 @@ def upload_context_files(client, file_paths_to_include=None):
             except (OSError, AttributeError):
                 is_stale = True # Re-upload to be safe.
 
+        uploaded_hash = _UPLOADED_CONTENT_HASHES.get(found_file.name)
+        if is_stale and uploaded_hash and _context_content_hash(file_path, buf_number) == uploaded_hash:
+            is_stale = False # Same content as the uploaded copy.
+
         if is_stale:
+            _UPLOADED_CONTENT_HASHES.pop(found_file.name, None)
             files_requiring_upload.append((file_path, buf_number))
             # It's good practice to delete the old one.
             try:
                 client.files.delete(name=found_file.name)
+                _invalidate_files_cache()
             except Exception:
                 pass # Deletion is best-effort.
         else:
@@ -146,12 +206,27 @@ def upload_context_files(client, file_paths_to_include=None):
 
 
     # --- 2. Prepare and filter files for upload ---
+    # Limit total upload size to 1MB. The budget is filled with the files
+    # most relevant to the current buffer first: the current file, then
+    # files with the same extension, then files in the same directory.
+    MAX_UPLOAD_BYTES = 1 * 1024 * 1024 # 1 Megabyte
+    current_name = vim.current.buffer.name
+    current_path = os.path.abspath(current_name) if current_name else ''
+    current_ext = os.path.splitext(current_path)[1]
+    current_dir = os.path.dirname(current_path)
+    files_requiring_upload.sort(key=lambda f: (
+        f[0] != current_path,
+        os.path.splitext(f[0])[1] != current_ext,
+        os.path.dirname(f[0]) != current_dir,
+    ))
+
     files_with_content = []
+    total_size = 0
+    eliminated_files = []
     for file_path, buf_number in files_requiring_upload:
         content = ""
         if buf_number is not None:
-            buf = vim.buffers[buf_number]
-            content = "\n".join(buf[:])
+            content = get_buffer_content(vim.buffers[buf_number])
         else:
             # Read from disk for files not in a buffer.
             try:
@@ -165,24 +240,17 @@ def upload_context_files(client, file_paths_to_include=None):
             continue
 
         content_bytes = content.encode('utf-8')
+        if total_size + len(content_bytes) > MAX_UPLOAD_BYTES:
+            eliminated_files.append(os.path.basename(file_path))
+            continue
+
+        total_size += len(content_bytes)
         files_with_content.append({
             'path': file_path,
             'content_bytes': content_bytes,
             'size': len(content_bytes)
         })
 
-    # Limit total upload size to 1MB
-    MAX_UPLOAD_BYTES = 1 * 1024 * 1024 # 1 Megabyte
-    total_size = sum(f['size'] for f in files_with_content)
-    eliminated_files = []
-
-    while total_size > MAX_UPLOAD_BYTES and files_with_content:
-        # Find and remove the largest file
-        largest_file = max(files_with_content, key=lambda f: f['size'])
-        files_with_content.remove(largest_file)
-        total_size -= largest_file['size']
-        eliminated_files.append(os.path.basename(largest_file['path']))
-
     if eliminated_files:
         util.display_message(f"Context files > 1MB. Excluded: {', '.join(sorted(eliminated_files))}", history=True)
         util.log_info(f"Excluded {len(eliminated_files)} files from context upload due to size limit: {', '.join(sorted(eliminated_files))}")
@@ -191,6 +259,7 @@ def upload_context_files(client, file_paths_to_include=None):
     # --- 3. Upload necessary files ---
     if files_with_content:
         util.display_message(f"Uploading {len(files_with_content)} context file(s)...")
+        from google.genai import types
 
     uploaded_files = []
     for file_info in files_with_content:
@@ -212,6 +281,8 @@ def upload_context_files(client, file_paths_to_include=None):
                 ),
             )
             uploaded_files.append(uploaded_file)
+            _UPLOADED_CONTENT_HASHES[uploaded_file.name] = hashlib.sha256(buf_content_bytes).hexdigest()
+            _invalidate_files_cache()
         except Exception as e:
             util.display_message(f"Error uploading {relative_path}: {e}", error=True)
             return None # Fail fast on upload error
@@ -427,7 +498,6 @@ def add_all_regular_files():
                 vim.command('setlocal modifiable')
                 buf[:] = buffer_lines
                 vim.command('setlocal readonly')
-                vim.command("redraw")
                 # Restore cursor position if possible
                 try:
                     win.cursor = (line_num, col)
@@ -438,8 +508,7 @@ def add_all_regular_files():
             util.display_message("No new regular files found to add.", history=True)
 
     except Exception as e:
-        err_msg = str(e).replace("'", "''")
-        vim.command(f"echoerr '[Vimini] Error adding regular files: {err_msg}'")
+        util.echoerr(f"[Vimini] Error adding regular files: {e}")
 
 def toggle_context_file():
     """
@@ -558,11 +627,10 @@ def toggle_context_file():
         vim.command('setlocal modifiable')
         buf[line_num - 1] = f"{new_prefix}{file_name}"
         vim.command('setlocal readonly')
-        vim.command("redraw")
         win.cursor = (line_num, col)
 
     except Exception as e:
-        vim.command(f"echoerr '[Vimini] Error toggling context file: {str(e).replace("'", "''")}'")
+        util.echoerr(f"[Vimini] Error toggling context file: {e}")
 
 def show_context_lists():
     """
@@ -570,7 +638,6 @@ def show_context_lists():
     Shows a popup with the current and pending context file lists.
     """
     global _VIMINI_PENDING_CONTEXT_FILES
-    popup_id = 0
     try:
         # Get active context files
         try:
@@ -604,26 +671,10 @@ def show_context_lists():
 
         popup_content.extend(['', '(Press any key to close)'])
 
-        # Create the popup
-        popup_options = {
-            'title': ' Context Lists ', 'line': 0, 'col': 0,
-            'minwidth': 40, 'maxwidth': 80,
-            'padding': [1, 2, 1, 2], 'border': [1, 1, 1, 1],
-            'borderchars': ['─', '│', '─', '│', '╭', '╮', '╯', '╰'],
-            'close': 'none', 'zindex': 200,
-        }
-        popup_id = vim.eval(f"popup_create({json.dumps(popup_content)}, {popup_options})")
-        vim.command("redraw!")
-        # Wait for any key to be pressed.
-        vim.eval('getchar()')
+        util.popup_getchar('Context Lists', popup_content)
 
     except Exception as e:
         util.display_message(f"Error showing context lists: {e}", error=True)
-    finally:
-        # Ensure the popup is always closed.
-        if int(popup_id) > 0:
-            vim.eval(f"popup_close({popup_id})")
-            vim.command("redraw!")
 
 def confirm_context_files():
     """
@@ -647,44 +698,21 @@ def confirm_context_files():
         except vim.error:
             original_files = []
 
-        # If there's no change, do nothing.
-        if sorted(pending_files) == sorted(original_files):
+        # If there's no change, do nothing. Order and duplicates do not matter.
+        if set(pending_files) == set(original_files):
             return
 
         # Build the popup content
         popup_content = ["Set new context files?", ""]
         if pending_files:
             popup_content.append("--- Files ---")
-            for f in sorted(pending_files):
-                popup_content.append(f"- {f}")
+            popup_content.extend(f"- {f}" for f in sorted(pending_files))
         else:
             popup_content.append("(Context will be empty)")
 
         popup_content.extend(['', '---', 'Accept changes? [y/n]'])
 
-        popup_options = {
-            'title': ' Confirm Context ', 'line': 0, 'col': 0,
-            'minwidth': 40, 'maxwidth': 80,
-            'padding': [1, 2, 1, 2], 'border': [1, 1, 1, 1],
-            'borderchars': ['─', '│', '─', '│', '╭', '╮', '╯', '╰'],
-            'close': 'none', 'zindex': 200,
-        }
-        popup_id = vim.eval(f"popup_create({popup_content}, {popup_options})")
-        vim.command("redraw!")
-
-        commit_confirmed = False
-        try:
-            answer_code = vim.eval('getchar()')
-            answer_char = chr(int(answer_code))
-            if answer_char.lower() == 'y':
-                commit_confirmed = True
-        except (vim.error, ValueError, TypeError):
-            pass
-        finally:
-            vim.eval(f"popup_close({popup_id})")
-            vim.command("redraw!")
-
-        if commit_confirmed:
+        if util.confirm_popup('Confirm Context', popup_content):
             # Use json.dumps to create a string that is a valid Vimscript list literal.
             vim.command(f"let g:context_files = {json.dumps(pending_files)}")
             util.display_message("Context files updated.", history=True)
@@ -761,64 +789,130 @@ def read_file(filepath):
 
 # --- Remote File Manager ---
 
-def _refresh_files_buffer():
+# Short-lived cache of the remote file list, to avoid a client.files.list()
+# round-trip on every action in the 'Vimini Files' buffer.
+_FILES_CACHE_TTL = 10.0 # Seconds
+# 'version' is bumped on every change made to the remote files, so a list
+# fetched in the background can tell whether it is already outdated.
+_FILES_CACHE = {'t': 0.0, 'client': None, 'data': None, 'by_name': {}, 'names': [], 'version': 0}
+# Number of the 'Vimini Files' buffer, remembered when it is created.
+_FILES_BUFFER_NUM = None
+
+def _files_cache_is_fresh(client):
+    """Returns True if the cached file list can be reused for this client."""
+    return (_FILES_CACHE['data'] is not None
+            and _FILES_CACHE['client'] == id(client)
+            and time.monotonic() - _FILES_CACHE['t'] < _FILES_CACHE_TTL)
+
+def _list_files_cached(client, force=False):
     """
-    Helper to re-fetch files and update the content of the 'Vimini Files' buffer.
+    Returns the list of remote files, reusing the cached list if it was
+    fetched by the same client less than _FILES_CACHE_TTL seconds ago.
+    A display_name -> file index and the sorted display names are kept
+    alongside in _FILES_CACHE['by_name'] and _FILES_CACHE['names'].
     """
-    # Find the 'Vimini Files' buffer
-    vimini_files_buffer = None
-    for b in vim.buffers:
-        if b.valid and b.name and b.name.endswith('Vimini Files'):
-            vimini_files_buffer = b
-            break
-    if not vimini_files_buffer:
+    if not force and _files_cache_is_fresh(client):
+        return _FILES_CACHE['data']
+
+    all_files = list(client.files.list())
+    _store_files_cache(client, all_files)
+    return all_files
+
+def _store_files_cache(client, all_files, fresh=True):
+    """
+    Stores a fetched file list in _FILES_CACHE. Must run on the main thread.
+    A list stored with fresh=False is shown but re-fetched on next use.
+    """
+    _FILES_CACHE['t'] = time.monotonic() if fresh else 0.0
+    _FILES_CACHE['client'] = id(client)
+    _FILES_CACHE['data'] = all_files
+    _FILES_CACHE['by_name'] = {f.display_name: f for f in all_files}
+    _FILES_CACHE['names'] = sorted(f.display_name for f in all_files)
+
+def _invalidate_files_cache():
+    """Forces the next _list_files_cached() call to re-fetch the list."""
+    _FILES_CACHE['t'] = 0.0
+    _FILES_CACHE['version'] += 1
+
+def _forget_cached_file(deleted_file):
+    """
+    Removes a file that was just deleted on the server from the cached
+    list, so the buffer can be redrawn without re-fetching it.
+    """
+    if _FILES_CACHE['data'] is None:
         return
+    _FILES_CACHE['data'] = [f for f in _FILES_CACHE['data'] if f.name != deleted_file.name]
+    _FILES_CACHE['by_name'] = {f.display_name: f for f in _FILES_CACHE['data']}
+    if deleted_file.display_name in _FILES_CACHE['names']:
+        _FILES_CACHE['names'].remove(deleted_file.display_name)
+    _FILES_CACHE['t'] = time.monotonic()
+    _FILES_CACHE['version'] += 1
+
+_FILES_BUFFER_HEADER = [
+    "Vimini Remote Files",
+    "-------------------",
+    " d: delete | D: delete all | i: info | q: close",
+    ""
+]
+_FILES_NO_FILES_LINE = "No files have been uploaded."
+_FILES_FETCHING_LINE = "Fetching file list..."
+# Stripped lines of the 'Vimini Files' buffer that do not name a file.
+_FILES_HEADER_LINES = frozenset(
+    [line.strip() for line in _FILES_BUFFER_HEADER] + [_FILES_NO_FILES_LINE, _FILES_FETCHING_LINE]
+)
+
+def _draw_files_listing(names):
+    """
+    Generates the list of lines for the 'Vimini Files' buffer from the
+    sorted display names.
+    """
+    return _FILES_BUFFER_HEADER + (names or [_FILES_NO_FILES_LINE])
 
+def _refresh_files_buffer():
+    """
+    Helper to re-fetch files and update the content of the 'Vimini Files' buffer.
+    """
     client = util.get_client()
     if not client:
         return
 
-    all_files = list(client.files.list())
-    file_list_content = [
-        "Vimini Remote Files",
-        "-------------------",
-        " d: delete | D: delete all | i: info | q: close",
-        ""
-    ]
-    if not all_files:
-        file_list_content.append("No files have been uploaded.")
-    else:
-        # Sorting is good for consistency
-        for f in sorted(all_files, key=lambda x: x.display_name):
-            file_list_content.append(f.display_name)
+    _list_files_cached(client)
+    _render_files_buffer()
 
-    # Switch to window, update buffer, switch back
-    win_nr = int(vim.eval(f"bufwinnr({vimini_files_buffer.number})"))
-    if win_nr > 0:
-        original_win_nr = int(vim.eval("winnr()"))
-        vim.command(f"{win_nr}wincmd w")
-        # Save cursor position before modifying the buffer
-        cursor_pos = vim.eval("getpos('.')")
+def _render_files_buffer():
+    """
+    Rewrites the 'Vimini Files' buffer from the cached file list.
+    """
+    # Find the 'Vimini Files' buffer, trying the remembered buffer first.
+    vimini_files_buffer = None
+    try:
+        b = vim.buffers[_FILES_BUFFER_NUM]
+        if b.valid and (b.name or '').endswith('Vimini Files'):
+            vimini_files_buffer = b
+    except (KeyError, TypeError):
+        pass
+    if not vimini_files_buffer:
+        # Let Vim search its buffer list instead of scanning it from Python.
+        buf_num = vim.Function('bufnr')('Vimini Files$')
+        if buf_num == -1:
+            return
+        vimini_files_buffer = vim.buffers[buf_num]
+
+    file_list_content = _draw_files_listing(_FILES_CACHE['names'])
 
-        vim.command("setlocal modifiable")
-        vimini_files_buffer[:] = file_list_content
-        vim.command("setlocal nomodifiable")
+    # Write the buffer in place, without switching windows.
+    vimini_files_buffer.options['modifiable'] = True
+    vimini_files_buffer[:] = file_list_content
+    vimini_files_buffer.options['modifiable'] = False
 
-        # Restore cursor position, adjusting if necessary
+    # Keep the cursor of the files window within the new content.
+    win_nr = vim.Function('bufwinnr')(vimini_files_buffer.number)
+    if win_nr > 0:
+        files_window = vim.windows[win_nr - 1]
+        lnum, col = files_window.cursor
         new_line_count = len(vimini_files_buffer)
-        lnum = int(cursor_pos[1])
         if lnum > new_line_count:
-            lnum = new_line_count
-        # Ensure line number is at least 1
-        if lnum < 1:
-            lnum = 1
-        cursor_pos[1] = str(lnum)
-        cursor_pos[0] = '0' # Use current buffer to be safe
-
-        vim.command(f"call setpos('.', {cursor_pos})")
-
-        if original_win_nr != win_nr:
-            vim.command(f"{original_win_nr}wincmd w")
+            files_window.cursor = (new_line_count, col)
 
 def _files_buffer_action(action):
     """
@@ -828,14 +922,14 @@ def _files_buffer_action(action):
     try:
         w = vim.current.window
         # Check if we are in the right buffer
-        if not (w.valid and w.buffer.name and w.buffer.name.endswith('Vimini Files')):
+        if not (w.valid and (w.buffer.name or '').endswith('Vimini Files')):
             return
 
         line_num = w.cursor[0]
         line = w.buffer[line_num - 1].strip()
 
         # Ignore header/blank lines
-        if not line or line.startswith("Vimini") or line.startswith("---") or "delete |" in line:
+        if line in _FILES_HEADER_LINES:
             return
 
         file_name = line
@@ -845,15 +939,12 @@ def _files_buffer_action(action):
 
         # Find the file object by its display_name
         util.display_message(f"Finding '{file_name}'...")
-        target_file = None
-        all_files = list(client.files.list())
-        for f in all_files:
-            if f.display_name == file_name:
-                target_file = f
-                break
+        _list_files_cached(client)
+        target_file = _FILES_CACHE['by_name'].get(file_name)
 
         if not target_file:
             util.display_message(f"Error: File '{file_name}' no longer exists on server. Refreshing list.", error=True)
+            _invalidate_files_cache()
             _refresh_files_buffer()
             return
 
@@ -870,16 +961,29 @@ def _files_buffer_action(action):
                 f"Created:      {target_file.create_time.isoformat()}",
                 f"URI:          {target_file.uri}",
             ]
-            util.new_split()
-            vim.command(f'file Vimini File Info: {file_name}')
-            vim.current.buffer[:] = info_content
-            vim.command('setlocal buftype=nofile filetype=markdown noswapfile nomodifiable')
+            # Reuse a single scratch buffer for file info, writing to it in
+            # place when it already exists.
+            info_buf_num = vim.Function('bufnr')('^Vimini File Info$')
+            if info_buf_num == -1:
+                util.new_split()
+                vim.command('file Vimini\\ File\\ Info')
+                vim.command('setlocal buftype=nofile bufhidden=hide filetype=markdown noswapfile')
+                info_buf_num = vim.current.buffer.number
+            elif vim.Function('bufwinnr')(info_buf_num) == -1:
+                util.new_split()
+                vim.command(f"buffer {info_buf_num}")
+
+            info_buffer = vim.buffers[info_buf_num]
+            info_buffer.options['modifiable'] = True
+            info_buffer[:] = info_content
+            info_buffer.options['modifiable'] = False
 
         elif action == "delete":
             util.display_message(f"Deleting '{file_name}'...")
             client.files.delete(name=target_file.name)
-            util.display_message(f"File '{file_name}' deleted. Refreshing list...", history=True)
-            _refresh_files_buffer()
+            _forget_cached_file(target_file)
+            util.display_message(f"File '{file_name}' deleted.", history=True)
+            _render_files_buffer()
 
     except Exception as e:
         util.display_message(f"Error during file action: {e}", error=True)
@@ -893,7 +997,7 @@ def _delete_all_files():
         if not client:
             return
 
-        all_files = list(client.files.list())
+        all_files = _list_files_cached(client)
         if not all_files:
             util.display_message("No remote files to delete.", history=True)
             return
@@ -905,29 +1009,7 @@ def _delete_all_files():
             "",
             "Confirm deletion? [y/n]"
         ]
-        popup_options = {
-            'title': ' Confirm Deletion ', 'line': 0, 'col': 0,
-            'minwidth': 40, 'maxwidth': 60,
-            'padding': [1, 2, 1, 2], 'border': [1, 1, 1, 1],
-            'borderchars': ['─', '│', '─', '│', '╭', '╮', '╯', '╰'],
-            'close': 'none', 'zindex': 200,
-        }
-        popup_id = vim.eval(f"popup_create({json.dumps(popup_content)}, {popup_options})")
-        vim.command("redraw!")
-
-        confirmed = False
-        try:
-            answer_code = vim.eval('getchar()')
-            answer_char = chr(int(answer_code))
-            if answer_char.lower() == 'y':
-                confirmed = True
-        except (vim.error, ValueError, TypeError):
-            pass # confirmed remains False
-        finally:
-            vim.eval(f"popup_close({popup_id})")
-            vim.command("redraw!")
-
-        if not confirmed:
+        if not util.confirm_popup('Confirm Deletion', popup_content, maxwidth=60):
             util.display_message("Deletion of all files cancelled.", history=True)
             return
 
@@ -947,6 +1029,7 @@ def _delete_all_files():
             message += f" {failed_count} files failed to delete."
         util.display_message(message, history=True)
 
+        _invalidate_files_cache()
         _refresh_files_buffer()
 
     except Exception as e:
@@ -958,30 +1041,24 @@ def files_command():
     to manage them.
     """
     util.log_info("files_command()")
+    global _FILES_BUFFER_NUM
     try:
         client = util.get_client()
         if not client:
             return
 
-        util.display_message("Fetching file list...")
-        all_files = list(client.files.list())
-        util.display_message("")
-
-        file_list_content = [
-            "Vimini Remote Files",
-            "-------------------",
-            " d: delete | D: delete all | i: info | q: close",
-            ""
-        ]
-        if not all_files:
-            file_list_content.append("No files have been uploaded.")
+        # Show the cached list right away, or a placeholder while the list is
+        # fetched in the background.
+        is_fresh = _files_cache_is_fresh(client)
+        if is_fresh:
+            file_list_content = _draw_files_listing(_FILES_CACHE['names'])
         else:
-            for f in sorted(all_files, key=lambda x: x.display_name):
-                file_list_content.append(f.display_name)
+            file_list_content = _FILES_BUFFER_HEADER + [_FILES_FETCHING_LINE]
 
         util.new_split()
         vim.command('file Vimini Files')
         buf = vim.current.buffer
+        _FILES_BUFFER_NUM = buf.number
         buf[:] = file_list_content
         vim.command('setlocal buftype=nofile noswapfile filetype=markdown')
 
@@ -991,7 +1068,30 @@ def files_command():
         vim.command("nnoremap <buffer> <silent> D :py3 from vimini.context import _delete_all_files; _delete_all_files()<CR>")
         vim.command("nnoremap <buffer> <silent> q :q<CR>")
 
-        vim.command('setlocal nomodifiable')
+        buf.options['modifiable'] = False
+
+        if not is_fresh:
+            # The list is fetched on the worker thread but only stored in the
+            # cache here, on the main thread. If files were uploaded or
+            # deleted meanwhile, it is shown but not considered fresh.
+            version = _FILES_CACHE['version']
+
+            def on_chunk(all_files):
+                _store_files_cache(client, all_files, fresh=_FILES_CACHE['version'] == version)
+                _render_files_buffer()
+
+            def on_finish():
+                return "File list updated."
+
+            def on_error(msg):
+                return f"Error listing files: {msg}"
+
+            util.start_background_task(lambda: list(client.files.list()), {
+                'on_chunk': on_chunk,
+                'on_finish': on_finish,
+                'on_error': on_error,
+                'status_message': "Fetching file list..."
+            }, job_name="Files: list")
 
     except Exception as e:
         util.display_message(f"Error listing files: {e}", error=True)
@@ -1,6 +1,5 @@
 import vim
-import os, subprocess, shlex, textwrap, json
-from google.genai import types
+import os, subprocess, shlex, tempfile, time
 from vimini import util
 from vimini.util import process_queue, get_model_name
 from vimini.autocomplete import autocomplete, cancel_autocomplete, process_autocomplete_queue
@@ -17,12 +16,17 @@ def initialize(api_key, model, logfile=None):
     optional logfile path.
     This function is called from the plugin's Vimscript entry point.
     """
+    if api_key != util._API_KEY:
+        # The client only depends on the API key, so keep the existing one
+        # (and its open connections) unless the key changes.
+        util._GENAI_CLIENT = None
     util._API_KEY = api_key
     util._MODEL = model
-    util._GENAI_CLIENT = None # Reset client if key/model changes.
     util.set_logging(logfile)
     if not util._API_KEY:
         util.display_message("API key not found. Please set g:vimini_api_key or store it in ~/.config/gemini.token.", error=True)
+    else:
+        util.warm_up_client()
 
 # This new function is needed because vimini.vim calls main.logging()
 def logging(logfile=None):
@@ -42,6 +46,7 @@ def reload_vimini():
         from vimini import util as old_util
         api_key = old_util._API_KEY
         model = old_util._MODEL
+        client = old_util._GENAI_CLIENT
         log_file = None
         if old_util._LOGGER and old_util._LOGGER.handlers:
             import logging
@@ -50,6 +55,7 @@ def reload_vimini():
                     log_file = handler.baseFilename
                     break
     except Exception:
+        client = None
         api_key = vim.eval("get(g:, 'vimini_api_key', '')")
         if not api_key:
             token_path = os.path.expanduser('~/.config/gemini.token')
@@ -64,17 +70,27 @@ def reload_vimini():
         if not log_file or vim.eval("get(g:, 'vimini_logging', 'off')") != 'on':
             log_file = None
 
+    # Keep track of the open code buffers, so apply_code() still finds them
+    # alongside the ones created after the reload.
+    old_code = sys.modules.get('vimini.code')
+    code_buffer_jobs = dict(old_code._CODE_BUFFER_JOBS) if old_code else {}
+
     # Delete all vimini modules from sys.modules
     modules_to_delete = [m for m in list(sys.modules.keys()) if m.startswith('vimini')]
     for m in modules_to_delete:
         del sys.modules[m]
 
-    # Re-import main and re-initialize
+    # Re-import main and re-initialize, carrying over the API client so the
+    # reloaded modules do not have to create and connect a new one.
     from vimini import main
+    from vimini import util as new_util
+    new_util._API_KEY = api_key
+    new_util._GENAI_CLIENT = client
+    from vimini import code as new_code
+    new_code._CODE_BUFFER_JOBS.update(code_buffer_jobs)
     main.initialize(api_key=api_key, model=model, logfile=log_file)
 
     # Use the freshly imported util to display the message
-    from vimini import util as new_util
     new_util.display_message("Vimini Python modules reloaded.", history=True)
 
 def reload_plugin():
@@ -83,34 +99,147 @@ def reload_plugin():
     """
     reload_vimini()
 
-def list_models():
+# The available models rarely change, so the list is kept for an hour.
+_MODELS_CACHE_TTL = 3600.0 # Seconds
+_MODELS_CACHE = {'t': 0.0, 'client': None, 'names': None}
+
+def list_models(force=False):
     """
     Lists the available Gemini models.
+
+    Args:
+        force (bool, optional): If True, bypasses the cached model list.
     """
-    util.log_info("list_models()")
+    util.log_info(f"list_models(force={force})")
     try:
         client = util.get_client()
         if not client:
             return
 
         # Get the list of models.
-        util.display_message("Fetching models...")
-        models = client.models.list()
-        util.display_message("") # Clear the message
-
-        # Prepare the content for the new buffer.
-        model_list = ["Available Models:"]
-        for model in models:
-            model_list.append(f"- {model.name}")
+        if (force or _MODELS_CACHE['names'] is None
+                or _MODELS_CACHE['client'] != id(client)
+                or time.monotonic() - _MODELS_CACHE['t'] >= _MODELS_CACHE_TTL):
+            util.display_message("Fetching models...")
+            names = [model.name for model in client.models.list()]
+            util.display_message("") # Clear the message
+            _MODELS_CACHE.update(t=time.monotonic(), client=id(client), names=names)
 
         # Display the models in a new split window.
         util.new_split()
         vim.command('setlocal buftype=nofile filetype=markdown noswapfile')
-        vim.current.buffer[:] = model_list
+        vim.current.buffer[:] = ["Available Models:", *(f"- {name}" for name in _MODELS_CACHE['names'])]
 
     except Exception as e:
         util.display_message(f"Error: {e}", error=True)
 
+# Background `git reset` processes started by _reset_staged_changes(), by
+# repository path. The next commit() waits for them, as both need the index.
+_RESET_PROCS = {}
+
+def _reset_staged_changes(repo_path):
+    """
+    Unstages the changes staged by commit(). The reset runs in the
+    background, as nothing depends on its result until the next commit().
+    """
+    _wait_for_reset(repo_path)
+    _RESET_PROCS[repo_path] = subprocess.Popen(['git', '-C', repo_path, 'reset', 'HEAD', '--'],
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def _wait_for_reset(repo_path):
+    """Waits for a background reset of `repo_path` to release the index."""
+    proc = _RESET_PROCS.pop(repo_path, None)
+    if proc:
+        proc.wait()
+
+# Diffs longer than this are truncated before being sent to the model. The
+# start of a large diff is enough to describe it, and reading it all would
+# only grow the prompt.
+_MAX_COMMIT_DIFF_BYTES = 256 * 1024
+
+def _read_git_diff(cmd):
+    """
+    Runs a git command producing a diff, reading at most
+    _MAX_COMMIT_DIFF_BYTES of its output. git is stopped once the limit is
+    reached and the diff is truncated at the last complete line, or at the
+    limit itself if even the first line is longer.
+
+    Returns:
+        tuple: (success, output) where output is the diff on success and
+               git's error message otherwise.
+    """
+    # stderr goes to a file rather than a pipe: it is only read once stdout
+    # is done, and git would block on a full stderr pipe meanwhile.
+    with tempfile.TemporaryFile() as stderr_file:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file) as proc:
+            output = proc.stdout.read(_MAX_COMMIT_DIFF_BYTES + 1)
+            truncated = len(output) > _MAX_COMMIT_DIFF_BYTES
+            if truncated:
+                proc.kill()
+
+        if not truncated and proc.returncode != 0:
+            stderr_file.seek(0)
+            return False, stderr_file.read().decode('utf-8', errors='replace').strip()
+
+    if truncated:
+        cut = output.rfind(b'\n', 0, _MAX_COMMIT_DIFF_BYTES) + 1
+        output = (output[:cut] if cut else output[:_MAX_COMMIT_DIFF_BYTES] + b'\n') + b"[... diff truncated ...]\n"
+    return True, output.decode('utf-8', errors='replace')
+
+def _read_git_diff_and_stats(diff_cmd, stat_cmds):
+    """
+    Reads a diff with _read_git_diff() while git computes summaries of it
+    (e.g. --stat) in parallel, instead of running the commands one after
+    the other.
+
+    Returns:
+        tuple: (success, output, stats) where success and output are as for
+               _read_git_diff() and stats holds the output of each of
+               stat_cmds, or "" for one that failed.
+    """
+    stat_procs = [subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                  for cmd in stat_cmds]
+    try:
+        diff_ok, diff_output = _read_git_diff(diff_cmd)
+    finally:
+        stat_outputs = [proc.communicate()[0] for proc in stat_procs]
+    stats = [output.strip() if proc.returncode == 0 else ""
+             for proc, output in zip(stat_procs, stat_outputs)]
+    return diff_ok, diff_output, stats
+
+# Staged changes touching a single file with at most this many added plus
+# deleted lines get a generic subject without asking the model.
+_TRIVIAL_COMMIT_MAX_LINES = 2
+
+def _trivial_change_file(numstat_output, name_status_output):
+    """
+    Checks if the staged changes are a trivial edit of a single file.
+
+    Args:
+        numstat_output (str): Output of `git diff --staged --numstat --no-renames`.
+        name_status_output (str): Output of `git diff --staged --name-status --no-renames`.
+
+    Returns:
+        str: The path of the changed file if the change is trivial,
+             None otherwise.
+    """
+    lines = numstat_output.splitlines()
+    if len(lines) != 1:
+        return None
+
+    # Only a plain modification is trivial. Added, deleted, renamed or
+    # type-changed files are left to the model.
+    if not name_status_output.startswith('M\t'):
+        return None
+
+    added, deleted, path = lines[0].split('\t', 2)
+    # Binary files are reported with '-' counts.
+    if not (added.isdigit() and deleted.isdigit()):
+        return None
+    if int(added) + int(deleted) > _TRIVIAL_COMMIT_MAX_LINES:
+        return None
+    return path
+
 def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
     """
     Generates a commit message. By default, it stages all changes and creates
@@ -123,24 +252,25 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
         if not repo_path:
             return # Error handled by helper
 
+        # A reset from a cancelled commit may still hold .git/index.lock.
+        _wait_for_reset(repo_path)
+
         diff_to_process = ""
         diff_stat_output = ""
+        numstat_output = ""
+        name_status_output = ""
 
         if regenerate:
             util.display_message("Getting diff from HEAD...")
             diff_cmd = ['git', '-C', repo_path, 'show', '--format=']
-            diff_result = subprocess.run(diff_cmd, capture_output=True, text=True, check=False)
+            stat_cmd = ['git', '-C', repo_path, 'show', '--format=', '--stat']
+            diff_ok, diff_output, (diff_stat_output,) = _read_git_diff_and_stats(diff_cmd, [stat_cmd])
 
-            if diff_result.returncode != 0:
-                error_message = (diff_result.stderr or "git show HEAD failed.").strip()
+            if not diff_ok:
+                error_message = diff_output or "git show HEAD failed."
                 util.display_message(f"Git error: {error_message}", error=True)
                 return
-            diff_to_process = diff_result.stdout.strip()
-
-            stat_cmd = ['git', '-C', repo_path, 'show', '--format=', '--stat']
-            stat_result = subprocess.run(stat_cmd, capture_output=True, text=True, check=False)
-            if stat_result.returncode == 0:
-                diff_stat_output = stat_result.stdout.strip()
+            diff_to_process = diff_output.strip()
         else:
             # Stage changes with filtering (exclude dotfiles and swap/backup files)
             util.display_message("Staging changes...")
@@ -183,37 +313,58 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
 
             if files_to_add:
                 add_cmd = ['git', '-C', repo_path, 'add', '--'] + files_to_add
-                add_result = subprocess.run(add_cmd, capture_output=True, text=True, check=False)
-
-                if add_result.returncode != 0:
-                    error_message = (add_result.stderr or add_result.stdout).strip()
+                add_proc = subprocess.Popen(add_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                try:
+                    # Create the API client, which imports google.genai on
+                    # first use, while git add hashes the files.
+                    if util._API_KEY:
+                        util.get_client()
+                finally:
+                    add_stdout, add_stderr = add_proc.communicate()
+
+                if add_proc.returncode != 0:
+                    error_message = (add_stderr or add_stdout).strip()
                     util.display_message(f"Git add failed: {error_message}", error=True)
                     return
 
             util.display_message("")
 
-            # Get the diff of what was just staged.
+            # Get the diff of what was just staged, its stat to show in the
+            # confirmation popup and, if trivial changes may skip the model,
+            # its numstat and name-status. Renames are split into a deletion
+            # and an addition so they are never taken for a small edit.
             staged_diff_cmd = ['git', '-C', repo_path, 'diff', '--staged']
-            staged_diff_result = subprocess.run(staged_diff_cmd, capture_output=True, text=True, check=False)
-
-            if staged_diff_result.returncode != 0:
-                error_message = staged_diff_result.stderr.strip()
-                util.display_message(f"Git error getting staged diff: {error_message}", error=True)
+            stat_cmds = [['git', '-C', repo_path, 'diff', '--staged', '--stat']]
+            check_trivial = not refinement and vim.eval("get(g:, 'vimini_commit_trivial', 1)") != '0'
+            if check_trivial:
+                stat_cmds.append(['git', '-C', repo_path, 'diff', '--staged', '--numstat', '--no-renames'])
+                stat_cmds.append(['git', '-C', repo_path, 'diff', '--staged', '--name-status', '--no-renames'])
+            diff_ok, diff_output, stats = _read_git_diff_and_stats(staged_diff_cmd, stat_cmds)
+            diff_stat_output = stats[0]
+            if check_trivial:
+                numstat_output, name_status_output = stats[1:]
+
+            if not diff_ok:
+                util.display_message(f"Git error getting staged diff: {diff_output}", error=True)
                 return
 
-            diff_to_process = staged_diff_result.stdout.strip()
-
-            # Get the diff stat to show in the confirmation popup.
-            staged_stat_cmd = ['git', '-C', repo_path, 'diff', '--staged', '--stat']
-            staged_stat_result = subprocess.run(staged_stat_cmd, capture_output=True, text=True, check=False)
-            if staged_stat_result.returncode == 0:
-                diff_stat_output = staged_stat_result.stdout.strip()
+            diff_to_process = diff_output.strip()
 
         if not diff_to_process:
             message = "HEAD commit is empty. Nothing to regenerate." if regenerate else "No changes to commit."
             util.display_message(message, history=True)
             return
 
+        # A tiny single-file change (e.g. a typo fix) gets a generic subject
+        # instead of a round-trip to the model, unless the user asked for
+        # something specific or disabled it with g:vimini_commit_trivial.
+        # It is still confirmed in the popup.
+        if numstat_output:
+            trivial_file = _trivial_change_file(numstat_output, name_status_output)
+            if trivial_file:
+                _finish_commit(f"Update {trivial_file}", repo_path, regenerate, False, diff_stat_output)
+                return
+
         # Create prompt for AI to generate subject and body.
         prompt = (
             "Based on the following git diff, generate a commit message with a subject and a body.\n\n"
@@ -234,15 +385,12 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
             "--- END GIT DIFF ---"
         )
 
-        util.display_message("Generating commit message... (this may take a moment)")
-
         client = util.get_client()
         if not client:
             msg = "Commit cancelled (client init failed)."
             if not regenerate:
                 msg += " Reverting `git add`."
-                reset_cmd = ['git', '-C', repo_path, 'reset', 'HEAD', '--']
-                subprocess.run(reset_cmd, check=False)
+                _reset_staged_changes(repo_path)
             util.display_message(msg, error=True)
             return
 
@@ -251,11 +399,70 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
             temperature=temperature
         )
 
-        response = client.models.generate_content(**kwargs)
-        util.display_message("")
+        # Generate the message in the background so Vim stays responsive.
+        # The response is only parsed once the stream has completed.
+        response_chunks = []
+        received_chars = 0
+
+        def on_chunk(text):
+            nonlocal received_chars
+            response_chunks.append(text)
+            received_chars += len(text)
+            return f"Generating commit message... ({received_chars} chars received)"
+
+        def on_finish():
+            # The confirmation popup reads a key with getchar(). Open it from
+            # its own timer rather than from the job queue callback.
+            global _PENDING_COMMIT
+            _PENDING_COMMIT = ("".join(response_chunks), repo_path, regenerate, assistant, diff_stat_output)
+            vim.command("call timer_start(0, 'ViminiInternalConfirmCommit')")
+            return "Commit message generated."
+
+        def on_error(msg):
+            if not regenerate:
+                _reset_staged_changes(repo_path)
+                return f"Error generating commit message: {msg}. Reverted `git add`."
+            return f"Error generating commit message: {msg}"
+
+        util.start_async_job(client, kwargs, {
+            'on_chunk': on_chunk,
+            'on_finish': on_finish,
+            'on_error': on_error,
+            'status_message': "Generating commit message..."
+        }, job_name="Commit message")
 
+    except FileNotFoundError:
+        util.display_message("Error: `git` command not found. Is it in your PATH?", error=True)
+    except Exception as e:
+        util.display_message(f"Error: {e}", error=True)
+
+# Arguments for _finish_commit() of a generated commit message waiting to
+# be confirmed.
+_PENDING_COMMIT = None
+
+def confirm_pending_commit():
+    """
+    Called by a one-shot timer once a commit message has been generated.
+    The confirmation popup is deferred while the user is not in Normal
+    mode, so keys typed in Insert mode do not answer it.
+    """
+    global _PENDING_COMMIT
+    if _PENDING_COMMIT is None:
+        return
+    if vim.eval("mode()") != 'n':
+        vim.command("call timer_start(200, 'ViminiInternalConfirmCommit')")
+        return
+    args, _PENDING_COMMIT = _PENDING_COMMIT, None
+    _finish_commit(*args)
+
+def _finish_commit(response_text, repo_path, regenerate, assistant, diff_stat_output):
+    """
+    Parses the generated commit message, asks for confirmation in a popup
+    and creates (or amends) the commit.
+    """
+    try:
         # Parse the response into subject and a raw body.
-        response_text = response.text.strip()
+        response_text = response_text.strip()
         if '---' in response_text:
             parts = response_text.split('---', 1)
             subject = parts[0].strip()
@@ -268,6 +475,8 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
         # Wrap the body so that no line is longer than 78 characters.
         body = ""
         if raw_body:
+            import textwrap
+            wrapper = textwrap.TextWrapper(width=78)
             wrapped_lines = []
             for line in raw_body.split('\n'):
                 # Preserve blank lines for paragraph separation. textwrap.wrap()
@@ -275,7 +484,7 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
                 if not line.strip():
                     wrapped_lines.append('')
                 else:
-                    wrapped_lines.extend(textwrap.wrap(line, width=78))
+                    wrapped_lines.extend(wrapper.wrap(line))
             body = '\n'.join(wrapped_lines)
 
 
@@ -283,8 +492,7 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
             msg = "Failed to generate a commit message."
             if not regenerate:
                 msg += " Reverting `git add`."
-                reset_cmd = ['git', '-C', repo_path, 'reset', 'HEAD', '--']
-                subprocess.run(reset_cmd, check=False)
+                _reset_staged_changes(repo_path)
             util.display_message(msg, error=True)
             return
 
@@ -298,52 +506,20 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
             popup_content.extend(['', stat_header])
             popup_content.extend(diff_stat_output.split('\n'))
 
-        popup_title = ' Regenerate Commit Message ' if regenerate else ' Commit Message '
+        popup_title = 'Regenerate Commit Message' if regenerate else 'Commit Message'
         popup_question = 'Amend HEAD with this message? [y/n]' if regenerate else 'Commit with this message? [y/n]'
         popup_content.extend(['', '---', popup_question])
 
-
-        # The str() representation of a Python dict is compatible with Vimscript's
-        # dict syntax, which is required for vim.eval(). For popup_create, the
-        # value 0 for 'line' and 'col' centers the popup.
-        popup_options = {
-            'title': popup_title, 'line': 0, 'col': 0,
-            'minwidth': 50, 'maxwidth': 80,
-            'padding': [1, 2, 1, 2], 'border': [1, 1, 1, 1],
-            'borderchars': ['─', '│', '─', '│', '╭', '╮', '╯', '╰'],
-            'close': 'none', 'zindex': 200,
-        }
-        # Use vim.eval to call Vim's popup_create function.
-        popup_id = vim.eval(f"popup_create({popup_content}, {popup_options})")
-        # Show the popup
-        vim.command("redraw!")
-
-        # Capture a single character for confirmation.
-        commit_confirmed = False
-        try:
-            # We convert it to a char to check for 'y' or 'Y'.
-            answer_code = vim.eval('getchar()')
-            # Ensure answer_code is a string that can be converted to an integer.
-            # If not (e.g., for special keys), it is not an affirmative answer.
-            answer_char = chr(int(answer_code))
-            if answer_char.lower() == 'y':
-                commit_confirmed = True
-        except (vim.error, ValueError, TypeError): # Catches Ctrl-C and non-integer return values.
-            pass # commit_confirmed remains False
-        finally:
-            # Ensure the popup is always closed, no matter what key was pressed.
-            vim.eval(f"popup_close({popup_id})")
-            # Redraw to clear any screen artifacts from the popup.
-            vim.command("redraw!")
+        commit_confirmed = util.confirm_popup(popup_title, popup_content, minwidth=50)
 
         # If user cancelled, revert the staging and exit.
         if not commit_confirmed:
             if regenerate:
-                util.display_message("Amend cancelled.", error=True)
+                msg = "Amend cancelled."
             else:
-                util.display_message("Commit cancelled. Reverting `git add`.", error=True)
-                reset_cmd = ['git', '-C', repo_path, 'reset', 'HEAD', '--']
-                subprocess.run(reset_cmd, check=False)
+                msg = "Commit cancelled. Reverting `git add`."
+                _reset_staged_changes(repo_path)
+            util.display_message(msg, error=True)
             return
 
         util.log_info("Commit Message accepted")
@@ -369,11 +545,13 @@ def commit(assistant=True, temperature=None, regenerate=False, refinement=None):
         if commit_result.returncode == 0:
             success_message = commit_result.stdout.strip().split('\n')[0]
             action_past = "Amend" if regenerate else "Commit"
-            util.display_message(f"{action_past} successful: {success_message}", history=True)
+            msg = f"{action_past} successful: {success_message}"
+            util.display_message(msg, history=True)
         else:
             error_message = (commit_result.stderr or commit_result.stdout).strip()
             action_past = "amend" if regenerate else "commit"
-            util.display_message(f"Git {action_past} failed: {error_message}", error=True)
+            msg = f"Git {action_past} failed: {error_message}"
+            util.display_message(msg, error=True)
 
     except FileNotFoundError:
         util.display_message("Error: `git` command not found. Is it in your PATH?", error=True)
@@ -391,8 +569,9 @@ def help(command_name=None):
         "VIMINI HELP",
         "===========",
         "",
-        ":ViminiListModels",
+        ":ViminiListModels[!]",
         "    Lists all available Gemini models in a new split window.",
+        "    The list is cached for an hour; use ! to fetch it again.",
         "",
         ":ViminiChat {prompt}",
         "    Sends a prompt to the configured Gemini model and displays the response.",
@@ -429,6 +608,8 @@ def help(command_name=None):
         "    -n: No co-author trailer.",
         "    -r: Regenerate/Amend HEAD.",
         "    [instruction]: Optional hint for the commit message generation.",
+        "    Changes of at most 2 lines in one modified file get the subject",
+        "    'Update <file>' without calling the model (g:vimini_commit_trivial).",
         "",
         ":ViminiFiles",
         "    Manages remote files uploaded to Gemini.",
@@ -454,10 +635,10 @@ def help(command_name=None):
 
     # Find or create buffer
     buf_name = "Vimini Help"
-    win_nr = vim.eval(f"bufwinnr('^{buf_name}$')")
+    win_nr = vim.Function('bufwinnr')(f'^{buf_name}$')
 
-    if int(win_nr) > 0:
-        vim.command(f"{win_nr}wincmd w")
+    if win_nr > 0:
+        util.goto_window(win_nr)
     else:
         util.new_split()
         vim.command(f'file {buf_name}')
@@ -5,6 +5,18 @@ import os
 import re
 from vimini import util, context, code
 
+def _split_git_objects(git_objects):
+    """
+    Splits the git objects argument into a list, refusing anything that git
+    would parse as an option. Returns None after showing an error if so.
+    """
+    objects = shlex.split(git_objects)
+    for obj in objects:
+        if obj.startswith('-'):
+            util.display_message("Security error: Git options (like flags starting with '-') are not allowed.", error=True)
+            return None
+    return objects
+
 def _construct_review_prompt(uploaded_files, prompt, content_source_description, security_focus):
     """
     Constructs the prompt for the review.
@@ -60,7 +72,9 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
             if not repo_path:
                 return
 
-            objects_to_resolve = shlex.split(git_objects)
+            objects_to_resolve = _split_git_objects(git_objects)
+            if objects_to_resolve is None:
+                return
 
             # Check if a range is specified. If not, we don't want to walk the whole history.
             rev_list_args = []
@@ -119,7 +133,14 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
 
                 # Get content (Synchronous for now to setup the prompt)
                 cmd_show = ['git', '-C', repo_path, 'show', commit_sha]
-                result_show = subprocess.run(cmd_show, capture_output=True, text=True, check=False)
+                cmd_files = ['git', '-C', repo_path, 'show', '--name-only', '--format=', commit_sha]
+                # As in interactive mode, list the changed files in parallel
+                # with the diff instead of waiting for it first.
+                files_proc = subprocess.Popen(cmd_files, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                try:
+                    result_show = subprocess.run(cmd_show, capture_output=True, text=True, check=False)
+                finally:
+                    files_output, _ = files_proc.communicate()
                 if result_show.returncode != 0:
                     error_message = (result_show.stderr or "git show failed.").strip()
                     util.display_message(f"Skipping {commit_sha[:7]}: {error_message}", error=True, history=True)
@@ -129,10 +150,8 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
 
                 # Get context
                 uploaded_files_single = []
-                cmd_files = ['git', '-C', repo_path, 'show', '--name-only', '--format=', commit_sha]
-                result_files = subprocess.run(cmd_files, capture_output=True, text=True, check=False)
-                if result_files.returncode == 0:
-                    changed_files_relative = [f for f in result_files.stdout.strip().split('\n') if f]
+                if files_proc.returncode == 0:
+                    changed_files_relative = [f for f in files_output.strip().split('\n') if f]
                     if changed_files_relative:
                         context_files_to_upload = [os.path.join(repo_path, rel_path) for rel_path in changed_files_relative]
                         uploaded_files_single = context.upload_context_files(client, file_paths_to_include=context_files_to_upload) or []
@@ -206,15 +225,20 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
             if not repo_path:
                 return
 
-            objects_to_show = shlex.split(git_objects)
-            for obj in objects_to_show:
-                if obj.startswith('-'):
-                    util.display_message("Security error: Git options (like flags starting with '-') are not allowed.", error=True)
-                    return
+            objects_to_show = _split_git_objects(git_objects)
+            if objects_to_show is None:
+                return
 
             cmd = ['git', '-C', repo_path, 'show'] + objects_to_show
+            cmd_files = ['git', '-C', repo_path, 'show', '--name-only', '--format='] + objects_to_show
             util.display_message(f"Running git show {git_objects}... ")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            # The list of changed files is only needed after the diff, so let
+            # git compute it in parallel rather than running both in turn.
+            files_proc = subprocess.Popen(cmd_files, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            finally:
+                files_output, _ = files_proc.communicate()
 
             if result.returncode != 0:
                 error_message = (result.stderr or "git show failed.").strip()
@@ -223,18 +247,16 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
             review_content = result.stdout
 
             util.display_message("Getting changed files for context...")
-            cmd_files = ['git', '-C', repo_path, 'show', '--name-only', '--format='] + objects_to_show
-            result_files = subprocess.run(cmd_files, capture_output=True, text=True, check=False)
-            if result_files.returncode == 0:
-                changed_files_relative = [f for f in result_files.stdout.strip().split('\n') if f]
+            if files_proc.returncode == 0:
+                changed_files_relative = [f for f in files_output.strip().split('\n') if f]
                 if changed_files_relative:
                     context_files_to_upload = [os.path.join(repo_path, rel_path) for rel_path in changed_files_relative]
                     uploaded_files = context.upload_context_files(client, file_paths_to_include=context_files_to_upload) or []
 
             content_source_description = f"the output of `git show {git_objects}`"
         else:
-            review_content = "\n".join(vim.current.buffer[:])
-            original_filetype = vim.eval('&filetype') or 'text'
+            review_content, original_filetype = vim.eval("[join(getline(1, '$'), \"\\n\"), &filetype]")
+            original_filetype = original_filetype or 'text'
             content_source_description = f"the following {original_filetype} code"
 
         if not review_content.strip():
@@ -248,10 +270,7 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
         base_buffer_name = f"[{job_id}] Vimini Review"
         safe_name = f"{base_buffer_name} [->G?]".replace(" ", "\\ ")
         vim.command(f"file {safe_name}")
-        vim.command('setlocal buftype=nofile')
-        vim.command('setlocal bufhidden=wipe')
-        vim.command('setlocal noswapfile')
-        vim.command('setlocal filetype=markdown')
+        vim.command('setlocal buftype=nofile bufhidden=wipe noswapfile filetype=markdown')
 
         review_buffer = vim.current.buffer
         review_buf_num = review_buffer.number
@@ -295,15 +314,15 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
             nonlocal is_first_chunk
             update_status_receiving()
             if is_first_chunk:
-                # Put a new terminator line that indicates where the actual review starts
-                util.append_to_buffer(review_buf_num, "\n========== REVIEW START ==========\n")
+                # Put a new terminator line that indicates where the actual
+                # review starts, written together with the first chunk.
+                text = "\n========== REVIEW START ==========\n" + text
                 is_first_chunk = False
             util.append_to_buffer(review_buf_num, text)
 
         def on_thought(text):
             update_status_receiving()
-            if verbose:
-                util.append_to_buffer(review_buf_num, text)
+            util.append_to_buffer(review_buf_num, text)
 
         def on_finish():
             try:
@@ -315,13 +334,18 @@ def review(prompt, git_objects=None, security_focus=False, verbose=False, temper
         def on_error(msg):
             return f"Error: {msg}"
 
-        util.display_message("Processing... (Async)")
-        util.start_async_job(client, kwargs, {
+        callbacks = {
             'on_chunk': on_chunk,
-            'on_thought': on_thought,
             'on_finish': on_finish,
             'on_error': on_error
-        }, job_id=job_id)
+        }
+        # Thoughts are only streamed into the review buffer in verbose mode,
+        # so skip the thought handler entirely otherwise.
+        if verbose:
+            callbacks['on_thought'] = on_thought
+
+        util.display_message("Processing... (Async)")
+        util.start_async_job(client, kwargs, callbacks, job_id=job_id)
 
     except FileNotFoundError:
         util.display_message("Error: `git` command not found. Is it in your PATH?", error=True)
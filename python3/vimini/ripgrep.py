@@ -3,7 +3,7 @@ import os
 import re
 import shlex
 import subprocess
-from . import util
+from . import util, context
 
 # To store state between search and apply
 RIPGREP_CONFIG_STORE = {}
@@ -180,11 +180,9 @@ def search(regex, path_to_search=".", context_lines=5):
         'project_root': project_root
     }
 
-    # Check if buffer already exists and delete it to avoid E95
-    for buf in vim.buffers:
-        if buf.name and buf.name.endswith('ViminiRipGrep'):
-            vim.command(f'bwipeout! {buf.number}')
-            break
+    # Wipe out any existing buffer to avoid E95. bufnr() returns -1 if there
+    # is none, and the resulting error is silenced.
+    vim.command("silent! execute 'bwipeout!' bufnr('ViminiRipGrep$')")
 
     util.new_split()
     vim.command('file ViminiRipGrep')
@@ -217,14 +215,14 @@ def command(arg_string):
 
     rg_buffer = None
     for buf in vim.buffers:
-        if buf.name and buf.name.endswith('ViminiRipGrep'):
+        if (buf.name or '').endswith('ViminiRipGrep'):
             rg_buffer = buf
             break
 
     if not rg_buffer:
         return
 
-    buffer_content = "\n".join(rg_buffer[:])
+    buffer_content = context.get_buffer_content(rg_buffer)
     if not buffer_content.strip():
         util.display_message("Ripgrep results are empty, nothing to send to Gemini.", history=True)
         return
@@ -259,10 +257,10 @@ def command(arg_string):
         if is_first_chunk:
             # Find the buffer again to ensure we have the object
             # and clear it before writing the first chunk of new content.
-            for b in vim.buffers:
-                if b.number == rg_buffer_num:
-                    b[:] = []
-                    break
+            try:
+                vim.buffers[rg_buffer_num][:] = []
+            except KeyError:
+                pass
             is_first_chunk = False
         
         util.append_to_buffer(rg_buffer_num, text)
@@ -289,7 +287,7 @@ def apply():
 
     rg_buffer = None
     for buf in vim.buffers:
-        if buf.name and buf.name.endswith('ViminiRipGrep'):
+        if (buf.name or '').endswith('ViminiRipGrep'):
             rg_buffer = buf
             break
     if not rg_buffer:
@@ -304,17 +302,23 @@ def apply():
     context_separator = RIPGREP_CONFIG_STORE['context_separator']
     project_root = RIPGREP_CONFIG_STORE.get('project_root', os.getcwd())
 
-    buffer_content = rg_buffer[:]
+    # getbufline() hands over all lines in a single call instead of building
+    # the list through the buffer object line by line.
+    buffer_content = vim.eval(f"getbufline({rg_buffer.number}, 1, '$')")
     changes = _parse_modified_buffer(buffer_content, file_ranges, context_separator)
     modified_files = _apply_changes(changes, file_ranges, project_root)
 
+    # Index the open buffers by path once instead of rescanning them for
+    # every modified file.
+    buffer_nums_by_path = {}
+    for number, name in util.list_named_buffers():
+        buffer_nums_by_path.setdefault(os.path.abspath(name), number)
+
     for absolute_path in modified_files:
-        normalized_target_path = os.path.abspath(absolute_path)
-        for buf in vim.buffers:
-            if buf.name and os.path.abspath(buf.name) == normalized_target_path:
-                vim.command(f'checktime {buf.number}')
-                break
+        buf_num = buffer_nums_by_path.get(os.path.abspath(absolute_path))
+        if buf_num is not None:
+            vim.command(f'checktime {buf_num}')
 
     RIPGREP_CONFIG_STORE = {}
-    vim.command(f'bdelete! {rg_buffer.number}')
+    vim.command(f'bwipeout! {rg_buffer.number}')
     util.display_message("Changes applied.", history=True)
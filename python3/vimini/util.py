@@ -2,19 +2,21 @@ import vim
 import os, subprocess, time, io, logging, inspect
 import threading
 import queue
-from google import genai
-from google.genai import types
 
 # Module-level variables to store the API key, model name, and client instance.
 _API_KEY = None
 _MODEL = None
 _MODEL_NAME = None
 _GENAI_CLIENT = None # Global, lazily-initialized client.
+_CLIENT_WARMUP_THREAD = None # Creates the client ahead of its first use.
 _REPO_NAME_CACHE = None # Cache for the git repository directory name.
 _REPO_ROOT_CACHE = None # Cache for the git repository root path.
 _LOGGER = None
+_LOG_ENABLED = False # True only when a log file handler is installed.
 
 _STATUS_BUFFER_NAME = "Vimini Status"
+# Number of the status buffer, so the status timer can look it up directly.
+_STATUS_BUFFER_NUM = None
 
 # --- Async Job Management ---
 _JOB_QUEUE = queue.Queue()
@@ -22,6 +24,10 @@ _JOB_COUNTER = 0
 _ACTIVE_JOBS = {}
 _JOB_NAMES = {}
 _JOB_CLIENTS = {}
+# Progress messages from streaming jobs are shown at most this often, as
+# each one costs an echo and a redraw.
+_PROGRESS_STATUS_INTERVAL = 0.5 # Seconds
+_LAST_PROGRESS_STATUS_TIME = 0.0
 
 def get_client():
     """
@@ -30,18 +36,54 @@ def get_client():
     global _GENAI_CLIENT
     if _GENAI_CLIENT is None:
         if not _API_KEY:
-            vim.command("echoerr '[Vimini] API key not set. Please run :ViminiInit'")
+            echoerr("[Vimini] API key not set. Please run :ViminiInit")
             return None
         try:
             vim.command("echo '[Vimini] Initializing API client...'")
             vim.command("redraw")
-            _GENAI_CLIENT = genai.Client(api_key=_API_KEY)
+            if _CLIENT_WARMUP_THREAD is not None:
+                # Let a client that is still being created in the
+                # background finish rather than creating a second one.
+                _CLIENT_WARMUP_THREAD.join()
+            if _GENAI_CLIENT is None:
+                # Imported here as google.genai is slow to load and is not
+                # needed until the first API call.
+                from google import genai
+                _GENAI_CLIENT = genai.Client(api_key=_API_KEY)
             vim.command("echo ''") # Clear the message
         except Exception as e:
-            vim.command(f"echoerr '[Vimini] Error creating API client: {e}'")
+            echoerr(f"[Vimini] Error creating API client: {e}")
             return None
     return _GENAI_CLIENT
 
+def warm_up_client():
+    """
+    Starts creating the genai.Client in a background thread, so the slow
+    google.genai import is done by the time the first command needs it.
+    """
+    global _CLIENT_WARMUP_THREAD
+    if _GENAI_CLIENT is not None or not _API_KEY:
+        return
+    if _CLIENT_WARMUP_THREAD is not None and _CLIENT_WARMUP_THREAD.is_alive():
+        return
+
+    api_key = _API_KEY
+
+    def worker():
+        global _GENAI_CLIENT
+        try:
+            from google import genai
+            client = genai.Client(api_key=api_key)
+        except Exception:
+            # get_client() tries again and reports the error.
+            return
+        # Drop the client if the API key was changed in the meantime.
+        if _GENAI_CLIENT is None and _API_KEY == api_key:
+            _GENAI_CLIENT = client
+
+    _CLIENT_WARMUP_THREAD = threading.Thread(target=worker, daemon=True)
+    _CLIENT_WARMUP_THREAD.start()
+
 def get_model_name():
     """
     Returns the resolved model name for the current _MODEL.
@@ -76,6 +118,74 @@ def new_split():
     else:
         vim.command('vnew')
 
+def goto_window(win_nr):
+    """
+    Makes window `win_nr` the current window. The :wincmd, and the autocmds
+    it triggers, is skipped if that window is already current.
+    """
+    if int(win_nr) != vim.current.window.number:
+        vim.command(f"{win_nr}wincmd w")
+
+def popup_getchar(title, content, minwidth=40, maxwidth=80):
+    """
+    Shows `content` in a centered popup and waits for a key press.
+
+    Args:
+        title (str): The popup title.
+        content (list): The lines to show.
+        minwidth (int, optional): The minimum popup width in columns.
+        maxwidth (int, optional): The maximum popup width in columns.
+
+    Returns:
+        The key as returned by getchar(), or None if it was interrupted.
+    """
+    # vim.Function() converts the Python list and dict to Vim values, so
+    # no escaping is needed. The value 0 for 'line' and 'col' centers
+    # the popup.
+    popup_options = {
+        'title': f" {title} ", 'line': 0, 'col': 0,
+        'minwidth': minwidth, 'maxwidth': maxwidth,
+        'padding': [1, 2, 1, 2], 'border': [1, 1, 1, 1],
+        'borderchars': ['─', '│', '─', '│', '╭', '╮', '╯', '╰'],
+        'close': 'none', 'zindex': 200,
+    }
+    popup_id = vim.Function('popup_create')(content, popup_options)
+    try:
+        # A plain redraw is enough to draw the popup; the full redraw! is
+        # done once after it is closed.
+        vim.command("redraw")
+        return vim.Function('getchar')()
+    except vim.error: # Catches Ctrl-C.
+        return None
+    finally:
+        # Ensure the popup is always closed, no matter what key was pressed.
+        vim.Function('popup_close')(popup_id)
+        # Redraw to clear any screen artifacts from the popup.
+        vim.command("redraw!")
+
+def confirm_popup(title, content, minwidth=40, maxwidth=80):
+    """
+    Shows `content` in a centered popup and asks for a y/n answer. The
+    arguments are as for popup_getchar().
+
+    Returns:
+        bool: True if 'y' or 'Y' was pressed.
+    """
+    answer_code = popup_getchar(title, content, minwidth, maxwidth)
+    # getchar() returns a Number for regular keys, compared directly with
+    # 'y' and 'Y'. Special keys are returned as bytes and are not an
+    # affirmative answer.
+    return answer_code in (ord('y'), ord('Y'))
+
+def list_named_buffers():
+    """
+    Returns a list of (buffer number, full path) pairs for every buffer that
+    has a name, fetched with a single vim.eval instead of a pass over
+    vim.buffers reading each buffer's attributes.
+    """
+    info = vim.eval("map(filter(getbufinfo(), 'v:val.name !=# \"\"'), '[v:val.bufnr, v:val.name]')")
+    return [(int(number), name) for number, name in info]
+
 def get_git_repo_root():
     """
     Finds the root directory of the git repository for the current buffer.
@@ -206,6 +316,25 @@ def log_info(message):
     if _LOGGER:
         _LOGGER.info(str(message))
 
+def _echo(command, message):
+    """
+    Runs an :echo style command with the given message. The message is passed
+    through a Vim variable, so it needs no quoting or escaping.
+    """
+    vim.vars['vimini_message'] = str(message)
+    try:
+        vim.command(f"{command} g:vimini_message")
+    finally:
+        vim.command("unlet! g:vimini_message")
+
+def echoerr(message):
+    """Shows an error message with :echoerr."""
+    _echo("echoerr", message)
+
+def echom(message):
+    """Shows a message with :echom, saving it to the message history."""
+    _echo("echom", message)
+
 def display_message(message, error=False, history=False, filename=None, line_number=None):
     """
     Displays a message to the user in the Vim command line.
@@ -220,27 +349,33 @@ def display_message(message, error=False, history=False, filename=None, line_num
         filename (str, optional): The source file of the message for logging.
         line_number (int, optional): The line number of the message for logging.
     """
-    if filename is None or line_number is None:
-        try:
-            # stack()[0] is current frame (display_message), stack()[1] is the caller's frame.
-            caller_frame_record = inspect.stack()[1]
-            frame = caller_frame_record[0]
-            info = inspect.getframeinfo(frame)
-            filename = info.filename
-            line_number = info.lineno
-        except (IndexError, AttributeError):
-            # If we can't get caller info, just proceed without it.
-            filename, line_number = None, None
-
-    # Escape single quotes and newlines to prevent breaking the Vim command string.
-    safe_message = str(message).replace("'", '"').replace('\n', ' ').replace('\r', '')
+    if not message and not error and not history:
+        # Clearing the message line needs no prefix and no immediate redraw,
+        # Vim repaints it on its next screen update.
+        vim.command("echo ''")
+        return
+
+    # Keep the message on a single line of the command line.
+    safe_message = str(message).replace('\n', ' ').replace('\r', '')
 
     prefix = f"[Vimini ({get_git_repo_name()})]"
     full_message = f"{prefix} {safe_message}"
 
     log_context = ""
-    if filename and line_number:
-        log_context = f"[{os.path.basename(filename)}:{line_number}] "
+    # The caller's location only ends up in the log, so it is not looked up
+    # at all when logging is disabled. _LOGGER is always set, with a
+    # NullHandler when there is no log file, so it cannot be tested here.
+    if _LOG_ENABLED:
+        if filename is None or line_number is None:
+            # Only the caller's frame is needed. inspect.stack() would also
+            # read source context for every frame on the stack.
+            frame = inspect.currentframe()
+            caller = frame.f_back if frame else None
+            if caller:
+                filename = caller.f_code.co_filename
+                line_number = caller.f_lineno
+        if filename and line_number:
+            log_context = f"[{os.path.basename(filename)}:{line_number}] "
 
     if error:
         command = "echoerr"
@@ -253,7 +388,7 @@ def display_message(message, error=False, history=False, filename=None, line_num
         command = "echo"
 
     try:
-        vim.command(f"{command} '{full_message}'")
+        _echo(command, full_message)
         # For transient messages, redraw to show them immediately without a 'Press ENTER' prompt.
         if not error and not history:
             vim.command("redraw")
@@ -277,6 +412,8 @@ def create_generation_kwargs(contents, temperature=None, verbose=False, response
     Returns:
         dict: A dictionary of keyword arguments for the API call.
     """
+    from google.genai import types
+
     generation_config = types.GenerateContentConfig()
 
     if temperature is not None:
@@ -327,7 +464,8 @@ def set_logging(log_file=None):
     If a log_file path is provided, it sets up a logger to write to that
     file. If log_file is None, it disables logging by adding a NullHandler.
     """
-    global _LOGGER
+    global _LOGGER, _LOG_ENABLED
+    _LOG_ENABLED = False
 
     # Use a named logger to avoid interfering with other plugins or Vim's root logger.
     logger = logging.getLogger('vimini')
@@ -357,6 +495,7 @@ def set_logging(log_file=None):
             )
             handler.setFormatter(formatter)
             logger.addHandler(handler)
+            _LOG_ENABLED = True
         else:
             # If no log file, add a NullHandler to silence logging.
             # This is better than setting _LOGGER to None, as calls to log_info()
@@ -368,6 +507,7 @@ def set_logging(log_file=None):
     except Exception as e:
         # If logging setup fails for any reason, fall back to a NullHandler
         # to ensure the plugin continues to function without logging.
+        _LOG_ENABLED = False
         if logger.hasHandlers():
             logger.handlers.clear()
         logger.addHandler(logging.NullHandler())
@@ -431,6 +571,38 @@ def start_async_job(client, kwargs, callbacks, job_id=None, job_name="Unknown",
     # Start the timer in Vim to poll the queue
     vim.command("call ViminiInternalStartJobTimer()")
 
+def start_background_task(func, callbacks, job_name="Unknown"):
+    """
+    Runs a blocking callable in a background thread so Vim stays responsive.
+    Its return value is delivered to callbacks['on_chunk'] on the main
+    thread through the job queue, followed by 'on_finish'. Exceptions are
+    delivered to 'on_error'.
+
+    Args:
+        func (callable): The blocking function to run. Takes no arguments.
+        callbacks: A dict of callbacks, as for start_async_job().
+        job_name (str, optional): The name of the job.
+
+    Returns:
+        int: The job ID.
+    """
+    job_id = reserve_next_job_id(job_name)
+    _ACTIVE_JOBS[job_id] = callbacks
+
+    def worker():
+        try:
+            _JOB_QUEUE.put((job_id, 'chunk', func()))
+            _JOB_QUEUE.put((job_id, 'finish', None))
+        except Exception as e:
+            _JOB_QUEUE.put((job_id, 'error', str(e)))
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    # Start the timer in Vim to poll the queue
+    vim.command("call ViminiInternalStartJobTimer()")
+    return job_id
+
 def continue_async_job(job_id, prompt, callbacks):
     """
     Continues an existing async job by sending additional prompts reusing the same client.
@@ -439,6 +611,9 @@ def continue_async_job(job_id, prompt, callbacks):
     start_async_job(None, kwargs, callbacks, job_id=job_id, job_name=f"Continue: {prompt[:30]}...")
 
 def _handle_response_stream(job_id, response_stream):
+    # Decide once whether thoughts are wanted, rather than queueing thought
+    # parts that no callback will consume.
+    wants_thoughts = 'on_thought' in _ACTIVE_JOBS.get(job_id, {})
     for chunk in response_stream:
         if hasattr(chunk, 'candidates') and not chunk.candidates:
             continue
@@ -450,15 +625,17 @@ def _handle_response_stream(job_id, response_stream):
                 if not candidate.content or not candidate.content.parts:
                     continue
                 for part in candidate.content.parts:
-                    if hasattr(part, 'thought_signature') and part.thought_signature:
-                        continue
-
-                    if not part.text:
+                    # Skip signature-only and empty parts first, with a
+                    # single attribute lookup for each check.
+                    text = part.text
+                    if not text or getattr(part, 'thought_signature', None):
                         continue
 
-                    is_thought = hasattr(part, 'thought') and part.thought
-                    msg_type = 'thought' if is_thought else 'chunk'
-                    _JOB_QUEUE.put((job_id, msg_type, part.text))
+                    if getattr(part, 'thought', False):
+                        if wants_thoughts:
+                            _JOB_QUEUE.put((job_id, 'thought', text))
+                    else:
+                        _JOB_QUEUE.put((job_id, 'chunk', text))
             elif hasattr(chunk, 'text'):
                  # Fallback for simple text chunks if structure varies
                  _JOB_QUEUE.put((job_id, 'chunk', chunk.text))
@@ -490,14 +667,33 @@ def _job_worker(client, kwargs, job_id, target_func=None):
 
 def process_queue():
     """Called by Vim timer to process updates from the thread."""
+    global _LAST_PROGRESS_STATUS_TIME
     status_update = None
+    is_progress = True
 
+    # Drain the queue first, merging consecutive text chunks of the same job
+    # and type, so a burst of small stream chunks reaches the callbacks (and
+    # the buffers they write to) as one update per timer tick.
+    pending = []
     while True:
         try:
             job_id, msg_type, data = _JOB_QUEUE.get_nowait()
         except queue.Empty:
             break
 
+        text_parts = None
+        if msg_type in ('chunk', 'thought') and isinstance(data, str):
+            last = pending[-1] if pending else None
+            if last and last[0] == job_id and last[1] == msg_type and last[3] is not None:
+                last[3].append(data)
+                continue
+            text_parts = [data]
+        pending.append((job_id, msg_type, data, text_parts))
+
+    for job_id, msg_type, data, text_parts in pending:
+        if text_parts is not None:
+            data = "".join(text_parts)
+
         callbacks = _ACTIVE_JOBS.get(job_id)
         if not callbacks:
             # Job might have been removed or is stale
@@ -509,54 +705,61 @@ def process_queue():
         display_status = f"[{job_id}] {status_message}"
         callback_status = None
 
-        if msg_type == 'chunk':
-            if 'on_chunk' in callbacks:
-                callback_status = callbacks['on_chunk'](data)
-
-            if callback_status and isinstance(callback_status, str):
-                status_update = (f"[{job_id}] {callback_status}", False)
-            else:
-                status_update = (display_status, False)
-
-        elif msg_type == 'thought':
-            if 'on_thought' in callbacks:
-                callback_status = callbacks['on_thought'](data)
-
-            if callback_status and isinstance(callback_status, str):
-                status_update = (f"[{job_id}] {callback_status}", False)
-            else:
-                status_update = (display_status, False)
-
-        elif msg_type == 'error':
-            if 'on_error' in callbacks:
-                callback_status = callbacks['on_error'](data)
-
-            if callback_status and isinstance(callback_status, str):
-                status_update = (f"[{job_id}] {callback_status}", True)
-            else:
-                status_update = (f"[{job_id}] Error: {data}", True)
-
-            if job_id in _ACTIVE_JOBS:
-                del _ACTIVE_JOBS[job_id]
-            if job_id in _JOB_NAMES:
-                del _JOB_NAMES[job_id]
-
-        elif msg_type == 'finish':
-            status_update = (f"[{job_id}] Finished.", False)
-
-            if 'on_finish' in callbacks:
-                callback_status = callbacks['on_finish']()
-
-            if callback_status and isinstance(callback_status, str):
-                status_update = (f"[{job_id}] {callback_status}", False)
+        # A failing callback must not lose the rest of the batch, which was
+        # already taken off the queue, nor leave a finished job active.
+        try:
+            if msg_type == 'chunk':
+                if 'on_chunk' in callbacks:
+                    callback_status = callbacks['on_chunk'](data)
+
+                if callback_status and isinstance(callback_status, str):
+                    status_update = (f"[{job_id}] {callback_status}", False)
+                else:
+                    status_update = (display_status, False)
+
+            elif msg_type == 'thought':
+                if 'on_thought' in callbacks:
+                    callback_status = callbacks['on_thought'](data)
+
+                if callback_status and isinstance(callback_status, str):
+                    status_update = (f"[{job_id}] {callback_status}", False)
+                else:
+                    status_update = (display_status, False)
+
+            elif msg_type == 'error':
+                if 'on_error' in callbacks:
+                    callback_status = callbacks['on_error'](data)
+
+                if callback_status and isinstance(callback_status, str):
+                    status_update = (f"[{job_id}] {callback_status}", True)
+                else:
+                    status_update = (f"[{job_id}] Error: {data}", True)
+                is_progress = False
+
+            elif msg_type == 'finish':
+                status_update = (f"[{job_id}] Finished.", False)
+                is_progress = False
+
+                if 'on_finish' in callbacks:
+                    callback_status = callbacks['on_finish']()
+
+                if callback_status and isinstance(callback_status, str):
+                    status_update = (f"[{job_id}] {callback_status}", False)
+        except Exception as e:
+            log_info(f"Job {job_id} {msg_type} callback failed: {e}")
+            status_update = (f"[{job_id}] Error: {e}", True)
+            is_progress = False
 
-            if job_id in _ACTIVE_JOBS:
-                del _ACTIVE_JOBS[job_id]
-            if job_id in _JOB_NAMES:
-                del _JOB_NAMES[job_id]
+        if msg_type in ('error', 'finish'):
+            _ACTIVE_JOBS.pop(job_id, None)
+            _JOB_NAMES.pop(job_id, None)
 
     if status_update:
-        display_message(status_update[0], error=status_update[1])
+        # Errors and completions are always shown, progress is throttled.
+        now = time.monotonic()
+        if not is_progress or now - _LAST_PROGRESS_STATUS_TIME >= _PROGRESS_STATUS_INTERVAL:
+            _LAST_PROGRESS_STATUS_TIME = now
+            display_message(status_update[0], error=status_update[1])
 
     # If no more active jobs, stop the timer
     if not _ACTIVE_JOBS:
@@ -590,29 +793,37 @@ def create_thoughts_buffer(job_id):
     return vim.current.buffer.number
 
 def append_to_buffer(buffer_number, text):
-    """Helper to append text to a buffer without switching windows if possible."""
+    """
+    Helper to append text to a buffer without switching windows if possible.
+    `text` may also be a list of lines, the first of which is appended to the
+    buffer's last line, like the text before the first newline of a string.
+    """
     if buffer_number == -1: return
 
-    buf = None
-    for b in vim.buffers:
-        if b.number == buffer_number:
-            buf = b
-            break
-    if not buf: return
-
     try:
-        # Split text by newlines
-        lines = text.split('\n')
+        buf = vim.buffers[buffer_number]
+    except KeyError:
+        return
 
-        # Append to the last line
-        if len(buf) > 0:
-            buf[-1] += lines[0]
+    try:
+        if isinstance(text, str) and '\n' not in text:
+            # Most streamed chunks are a few words without a newline, which
+            # only extend the last line.
+            if text:
+                buf[-1] += text
         else:
-            buf[:] = [lines[0]]
-
-        # Append remaining lines
-        if len(lines) > 1:
-            buf.append(lines[1:])
+            # Split text by newlines
+            lines = text.split('\n') if isinstance(text, str) else text
+
+            # Extend the last line and add the remaining lines in a single
+            # slice assignment, so Vim updates the buffer only once per chunk.
+            # The last line is only rewritten if there is text to add to it.
+            if len(buf) == 0:
+                buf[:] = lines
+            elif lines[0]:
+                buf[-1:] = [buf[-1] + lines[0]] + lines[1:]
+            elif len(lines) > 1:
+                buf.append(lines[1:])
 
         # If the buffer is in the current window, scroll to bottom
         if vim.current.buffer.number == buffer_number:
@@ -649,24 +860,37 @@ def append_job_summary(buffer_num, job_id, prompt, context_files):
 
     append_to_buffer(buffer_num, "\n".join(summary))
 
-def show_status():
-    log_info("show_status()")
-    # Find buffer
-    buf = None
-    target_name = _STATUS_BUFFER_NAME
+def _find_status_buffer():
+    """
+    Returns the status buffer, or None if it does not exist.
+    """
+    global _STATUS_BUFFER_NUM
+    if _STATUS_BUFFER_NUM is not None:
+        try:
+            return vim.buffers[_STATUS_BUFFER_NUM]
+        except KeyError:
+            _STATUS_BUFFER_NUM = None
 
-    # Iterate buffers to find by name
+    # Not created by this module instance (e.g. after a reload), find it by name.
     for b in vim.buffers:
         # b.name is full path. We check basename.
-        if b.name and os.path.basename(b.name) == target_name:
-            buf = b
-            break
+        name = b.name
+        if name and os.path.basename(name) == _STATUS_BUFFER_NAME:
+            _STATUS_BUFFER_NUM = b.number
+            return b
+    return None
+
+def show_status():
+    global _STATUS_BUFFER_NUM
+    log_info("show_status()")
+    target_name = _STATUS_BUFFER_NAME
+    buf = _find_status_buffer()
 
     if buf:
         # Check if visible in current tab
-        win_nr = int(vim.eval(f"bufwinnr({buf.number})"))
+        win_nr = vim.Function('bufwinnr')(buf.number)
         if win_nr != -1:
-            vim.command(f"{win_nr}wincmd w")
+            goto_window(win_nr)
         else:
             # If hidden or in another tab, we split in current tab
             new_split()
@@ -682,25 +906,19 @@ def show_status():
         # Add autocmd to restart timer when window is re-entered
         vim.command("autocmd BufWinEnter <buffer> call ViminiInternalStartStatusTimer()")
         buf = vim.current.buffer
+        _STATUS_BUFFER_NUM = buf.number
 
     update_status_buffer()
     vim.command("call ViminiInternalStartStatusTimer()")
 
 def update_status_buffer():
-    # Find buffer
-    buf = None
-    target_name = _STATUS_BUFFER_NAME
-    for b in vim.buffers:
-        if b.name and os.path.basename(b.name) == target_name:
-            buf = b
-            break
-
+    buf = _find_status_buffer()
     if not buf:
         vim.command("call ViminiInternalStopStatusTimer()")
         return
 
     # Check visibility
-    win_nr = int(vim.eval(f"bufwinnr({buf.number})"))
+    win_nr = vim.Function('bufwinnr')(buf.number)
     if win_nr == -1:
         # If not visible in current tab, do not update, but keep timer running
         # so it updates when we switch back to the tab with status window.